@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+
+from usftt_results_teams import compute_standings
+from pipeline import STATE_DIR, load_artifact
+from collections import OrderedDict
+from email.utils import formatdate
+from urllib.parse import parse_qsl, urlsplit
+
+import os
+import csv
+import gzip
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+
+HOST = '127.0.0.1'
+PORT = 8080
+
+# Vérification des fichiers sources (rechargement à chaud)
+RELOAD_INTERVAL = 2.0
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+# Réponses sérialisées gardées en mémoire (par état chargé)
+RESPONSE_CACHE_SIZE = 4096
+# En dessous, la compression coûte plus qu'elle ne rapporte
+GZIP_MIN_SIZE = 1024
+
+REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+# ============================================================
+# 📚 Données indexées
+# ============================================================
+
+def read_csv(filename):
+    try:
+        with open(filename, newline='', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+    except FileNotFoundError:
+        return []
+
+class Response:
+    """Serialized response: body, ETag and gzip variant computed once."""
+
+    __slots__ = ('status', 'body', 'etag', 'gzipped', 'gzip_etag')
+
+    def __init__(self, status, payload):
+        self.status = status
+        self.body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        digest = hashlib.sha1(self.body).hexdigest()[:20]
+        self.etag = f'"{digest}"'
+        self.gzipped = gzip.compress(self.body, compresslevel=6, mtime=0) if len(self.body) >= GZIP_MIN_SIZE else None
+        # A strong ETag identifies one representation: the gzip variant has its own
+        self.gzip_etag = f'"{digest}-gz"'
+
+class Collection:
+    """Rows of a dataset, with equality indexes built on first use per column."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self._indexes = {}
+
+    def index(self, column):
+        if column not in self._indexes:
+            index = {}
+            for position, row in enumerate(self.rows):
+                index.setdefault(row.get(column), []).append(position)
+            self._indexes[column] = index
+        return self._indexes[column]
+
+    def filter(self, filters):
+        """Rows matching every column=value filter (unknown columns match nothing)."""
+        if not filters:
+            return self.rows
+        if self.rows and any(column not in self.rows[0] for column in filters):
+            return []
+        positions = None
+        for column, value in sorted(filters.items(), key=lambda f: len(self.index(f[0]).get(f[1], ()))):
+            matching = self.index(column).get(value, ())
+            if positions is None:
+                positions = matching
+            else:
+                matching = set(matching)
+                positions = [p for p in positions if p in matching]
+            if not positions:
+                return []
+        return [self.rows[p] for p in positions]
+
+class DataState:
+    """Immutable snapshot of the backend outputs, swapped as a whole on reload."""
+
+    def __init__(self, data_dir='data', club_number='08940073', state_dir=STATE_DIR):
+        self.sources = [os.path.join(data_dir, f"{name}_{club_number}.csv")
+                        for name in ('licenses', 'competitors', 'rencontres')]
+        self.sources += [os.path.join(state_dir, f"{name}.json") for name in ('poules', 'standings')]
+        self.mtimes = source_mtimes(self.sources)
+
+        licences = {row['licence']: row for row in read_csv(self.sources[0])}
+        for row in read_csv(self.sources[1]):
+            licences[row['licence']] = dict(licences.get(row['licence'], {}), **row)
+        self.players = Collection(sorted(licences.values(), key=lambda row: (row.get('nom', ''), row.get('prenom', ''))))
+        self.players_by_licence = {row['licence']: row for row in self.players.rows}
+
+        self.rencontres = Collection(read_csv(self.sources[2]))
+        team_fields = ('team_id', 'team_name', 'division', 'poule', 'rang', 'points', 'joues',
+                       'victoires', 'nuls', 'defaites', 'forfaits')
+        teams = {}
+        for row in self.rencontres.rows:
+            team = teams.setdefault(row['team_id'], dict({k: row.get(k) for k in team_fields}, rencontres=[]))
+            team['rencontres'].append({k: v for k, v in row.items() if k not in team_fields})
+        self.teams_by_id = teams
+        self.teams = Collection([{k: v for k, v in team.items() if k != 'rencontres'} for team in teams.values()])
+
+        # Full standings come from the pipeline artifacts: resolved standings first
+        # (official ranking when a penalty or correction applies), then computed
+        # from the poule's rencontres; the CSV alone only knows the club's teams
+        self.standings = {}
+        for team in self.teams.rows:
+            self.standings.setdefault(team['poule'], []).append(
+                dict({k: team[k] for k in ('rang', 'points', 'joues', 'victoires', 'nuls', 'defaites', 'forfaits')},
+                     equipe=team['team_name'].split(' - Phase')[0]))
+        for poule_number, tours in (load_artifact('poules', state_dir) or {}).items():
+            self.standings[poule_number] = [dict(ranking, equipe=name) for name, ranking in compute_standings(tours).items()]
+        for poule_number, standings in (load_artifact('standings', state_dir) or {}).items():
+            self.standings[poule_number] = [dict(ranking, equipe=name) for name, ranking in standings.items()]
+        for standings in self.standings.values():
+            standings.sort(key=rank_order)
+
+        self._responses = OrderedDict()
+
+    def cached(self, key, build):
+        """Response for `key`, built once per state."""
+        response = self._responses.get(key)
+        if response is not None:
+            self._responses.move_to_end(key)
+        else:
+            response = build()
+            self._responses[key] = response
+            if len(self._responses) > RESPONSE_CACHE_SIZE:
+                self._responses.popitem(last=False)
+        return response
+
+def rank_order(ranking):
+    """Sort key of a standings row: unranked teams ('N/A') last."""
+    rang = str(ranking.get('rang') or '')
+    return (0, int(rang)) if rang.isdigit() else (1, 0)
+
+def source_mtimes(sources):
+    mtimes = []
+    for filename in sources:
+        try:
+            mtimes.append(os.stat(filename).st_mtime_ns)
+        except FileNotFoundError:
+            mtimes.append(None)
+    return mtimes
+
+# ============================================================
+# 🧭 Routes
+# ============================================================
+
+def paginate(rows, params):
+    try:
+        offset = max(int(params.pop('offset', 0)), 0)
+        limit = min(max(int(params.pop('limit', DEFAULT_LIMIT)), 0), MAX_LIMIT)
+    except ValueError:
+        return Response(400, {'error': 'offset and limit must be integers'})
+    rows = rows(params)
+    return Response(200, {'total': len(rows), 'offset': offset, 'limit': limit, 'items': rows[offset:offset + limit]})
+
+def route(state, path, params):
+    """Build the response of a GET request."""
+    parts = [p for p in path.split('/') if p]
+    not_found = Response(404, {'error': f"Not found: {path}"})
+
+    if parts == ['players']:
+        return paginate(state.players.filter, params)
+    if parts == ['teams']:
+        return paginate(state.teams.filter, params)
+    if parts == ['rencontres']:
+        return paginate(state.rencontres.filter, params)
+    if len(parts) == 2 and parts[0] == 'players':
+        player = state.players_by_licence.get(parts[1])
+        return Response(200, player) if player else not_found
+    if len(parts) == 2 and parts[0] == 'teams':
+        team = state.teams_by_id.get(parts[1])
+        return Response(200, team) if team else not_found
+    if len(parts) == 3 and parts[0] == 'poules' and parts[2] == 'standings':
+        standings = state.standings.get(parts[1])
+        return Response(200, standings) if standings is not None else not_found
+    return not_found
+
+def accepts_gzip(accept_encoding):
+    """Whether an Accept-Encoding header allows gzip ('gzip;q=0' refuses it)."""
+    for coding in accept_encoding.split(','):
+        name, *params = [part.strip() for part in coding.split(';')]
+        if name.lower() == 'gzip':
+            quality = next((p[2:] for p in params if p.lower().startswith('q=')), '1')
+            try:
+                return float(quality) > 0
+            except ValueError:
+                return False
+    return False
+
+def respond(state, method, target, headers):
+    """Return (status, headers, body) for a request on the given state.
+
+    A HEAD response has no body but the Content-Length of the GET one.
+    """
+    if method not in ('GET', 'HEAD'):
+        response = Response(405, {'error': f"Method not allowed: {method}"})
+    else:
+        url = urlsplit(target)
+        params = dict(parse_qsl(url.query))
+        key = (url.path.rstrip('/'), tuple(sorted(params.items())))
+        response = state.cached(key, lambda: route(state, url.path, params))
+
+    body, etag = response.body, response.etag
+    response_headers = {'Content-Type': 'application/json; charset=utf-8',
+                        'Vary': 'Accept-Encoding', 'Cache-Control': 'no-cache'}
+    if response.gzipped is not None and accepts_gzip(headers.get('accept-encoding', '')):
+        body, etag = response.gzipped, response.gzip_etag
+        response_headers['Content-Encoding'] = 'gzip'
+    response_headers['ETag'] = etag
+    if response.status == 200 and headers.get('if-none-match') == etag:
+        return 304, response_headers, b''
+
+    response_headers['Content-Length'] = str(len(body))
+    return response.status, response_headers, b'' if method == 'HEAD' else body
+
+# ============================================================
+# 🌐 Serveur HTTP
+# ============================================================
+
+class ApiServer:
+    """Minimal HTTP/1.1 server (keep-alive, GET/HEAD) over a hot-reloaded DataState."""
+
+    def __init__(self, load_state, reload_interval=RELOAD_INTERVAL):
+        self.load_state = load_state
+        self.reload_interval = reload_interval
+        self.state = load_state()
+
+    async def reload_forever(self):
+        """Rebuild the state in a thread when a source file changes, then swap it."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            if source_mtimes(self.state.sources) == self.state.mtimes:
+                continue
+            try:
+                self.state = await loop.run_in_executor(None, self.load_state)
+                print(f"🔄 Reloaded {len(self.state.players.rows)} players, {len(self.state.teams.rows)} teams")
+            except Exception as e:
+                print(f"⚠️  Warning: reload failed, keeping previous data: {e}")
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                status, response_headers, body = respond(self.state, method, target, headers)
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                # 304 has no body and no Content-Length
+                head = [f"HTTP/1.1 {status} {REASONS[status]}", f"Date: {formatdate(usegmt=True)}",
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+                head += [f"{name}: {value}" for name, value in response_headers.items()]
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=HOST, port=PORT):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        reloader = asyncio.ensure_future(self.reload_forever())
+        print(f"🌐 Serving on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            reloader.cancel()
+
+def main():
+    """Serve the backend outputs (data/*.csv) as a JSON API."""
+    parser = argparse.ArgumentParser(description="API locale des joueurs et équipes USFTT")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args()
+
+    # USFTT club number
+    club_number = "08940073"
+
+    start = time.perf_counter()
+    server = ApiServer(lambda: DataState(club_number=club_number))
+    print(f"📚 {len(server.state.players.rows)} players, {len(server.state.teams.rows)} teams, "
+          f"{len(server.state.standings)} poules loaded in {time.perf_counter() - start:.2f}s")
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
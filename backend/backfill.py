@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+
+from fftt import FFTTApiClient, as_list
+from usftt_results import fetch_licenses, fetch_parties
+from usftt_results_teams import fetch_club_teams, parse_division_link
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+import io
+import os
+import re
+import sys
+import csv
+import glob
+import gzip
+import json
+import shutil
+import argparse
+
+# Débit réservé au rattrapage : il tourne à côté du rafraîchissement nocturne
+MAX_REQUESTS_PER_SECOND = 4
+MAX_WORKERS = 8
+
+HISTORY_DIR = os.path.join('data', 'history')
+
+# Une saison commence le 1er juillet
+SEASON_START_MONTH = 7
+
+# ============================================================
+# 📅 Saisons
+# ============================================================
+
+def season_of(day):
+    """Season of a date (date or 'dd/mm/yyyy'), e.g. '2025-2026'."""
+    if isinstance(day, str):
+        day = datetime.strptime(day, '%d/%m/%Y').date()
+    start = day.year if day.month >= SEASON_START_MONTH else day.year - 1
+    return f"{start}-{start + 1}"
+
+def parse_saison(label):
+    """Season of a historique_classement label ('Saison 2019 / 2020' -> '2019-2020'), None if unknown."""
+    years = re.findall(r'\d{4}', label or '')
+    return f"{years[0]}-{years[1]}" if len(years) == 2 else None
+
+# ============================================================
+# 🧩 Tâches de rattrapage
+# ============================================================
+
+# Les données d'une saison close ne changent plus : ses tâches ne tournent qu'une
+# fois. Celles de la saison en cours sont datées, donc relancées chaque jour.
+def dated(job_id, day):
+    return f"{job_id}@{day.isoformat()}"
+
+def player_job(licence, day=None):
+    """Job fetching the whole history of a player: dataset -> rows.
+
+    It includes the current season, so its id is dated (`day`, default today).
+    """
+
+    def run(client):
+        histo = client.historique_classement(licence).get('liste')
+        classements = [dict(h, licence=licence, saison=parse_saison(h.get('saison')))
+                       for h in as_list(histo.get('histo') if isinstance(histo, dict) else None)]
+        parties = []
+        for partie in fetch_parties(client, licence):
+            try:
+                saison = season_of(partie.get('date'))
+            except (TypeError, ValueError):
+                continue
+            parties.append(dict(partie, licence=licence, saison=saison))
+        return {'classements': classements, 'parties': parties}
+
+    return dated(f"joueur_{licence}", day or date.today()), run
+
+def poule_jobs(seasons, day=None):
+    """Jobs fetching the rencontres of every poule of the recorded seasons (once per poule).
+
+    Poules of the current season (on `day`, default today) get dated ids.
+    """
+    day = day or date.today()
+    poules = {}
+    for saison, teams in sorted(seasons.items()):
+        for team in teams:
+            poule_number, division_id = parse_division_link(team.get('liendivision', ''))
+            poules.setdefault((saison, poule_number, division_id), []).append(team)
+
+    def job(saison, poule_number, division_id, teams):
+        def run(client):
+            liste = client.rencontre_equipes(poule_number).get('liste')
+            tours = as_list(liste.get('tour') if isinstance(liste, dict) else None)
+            return {
+                'equipes': [{'saison': saison, 'poule': poule_number, 'division': division_id,
+                             'libequipe': team.get('libequipe', ''), 'libdivision': team.get('libdivision', ''),
+                             'libepr': team.get('libepr', '')} for team in teams],
+                'rencontres': [dict(tour, saison=saison, poule=poule_number, division=division_id) for tour in tours],
+            }
+        job_id = f"poule_{saison}_{poule_number}"
+        return (dated(job_id, day) if saison == season_of(day) else job_id), run
+
+    return [job(*key, teams) for key, teams in poules.items()]
+
+def record_season_teams(teams, saison, history_dir=HISTORY_DIR):
+    """Remember the club's teams of a season; returns all recorded seasons.
+
+    The team endpoints only serve the current season: their poules can only be
+    backfilled for the seasons recorded here.
+    """
+    filename = os.path.join(history_dir, 'equipes.json')
+    try:
+        with open(filename, encoding='utf-8') as f:
+            seasons = json.load(f)
+    except FileNotFoundError:
+        seasons = {}
+    seasons[saison] = teams
+    os.makedirs(history_dir, exist_ok=True)
+    with open(f"{filename}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(seasons, f, ensure_ascii=False, indent=1)
+    os.replace(f"{filename}.tmp", filename)
+    return seasons
+
+# ============================================================
+# ▶️ Exécution reprenable
+# ============================================================
+
+def part_path(job_id, history_dir=HISTORY_DIR):
+    return os.path.join(history_dir, 'parts', f"{job_id}.json.gz")
+
+def run_jobs(client, jobs, history_dir=HISTORY_DIR, max_workers=MAX_WORKERS, max_requests=None):
+    """Run the jobs not done yet, in parallel; returns the number of jobs left.
+
+    Each finished job is saved atomically in `parts/`: an interrupted backfill
+    resumes where it stopped. A job replaces the parts of its previous dates
+    (an undated job, those of the season it closed). Once `client.request_count` reaches `max_requests`, no new job starts
+    (the ones running finish).
+    """
+    pending = [(job_id, run) for job_id, run in jobs if not os.path.exists(part_path(job_id, history_dir))]
+    print(f"🗂️  {len(jobs) - len(pending)} jobs already done, {len(pending)} to run")
+    os.makedirs(os.path.join(history_dir, 'parts'), exist_ok=True)
+
+    def execute(job):
+        job_id, run = job
+        if max_requests is not None and client.request_count >= max_requests:
+            return False
+        try:
+            result = run(client)
+        except Exception as e:
+            print(f"⚠️  Warning: job {job_id} failed: {e}")
+            return False
+        path = part_path(job_id, history_dir)
+        with gzip.open(f"{path}.tmp", 'wt', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False)
+        os.replace(f"{path}.tmp", path)
+        # Previous dated parts of the job (including the last ones of a season now closed)
+        for stale in glob.glob(part_path(f"{job_id.split('@')[0]}@*", history_dir)):
+            if stale != path:
+                os.remove(stale)
+        return True
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        done = sum(executor.map(execute, pending))
+    return len(pending) - done
+
+def compact(history_dir=HISTORY_DIR):
+    """Merge the job parts into one gzip CSV per season and dataset.
+
+    Layout: `saison=2024-2025/<dataset>.csv.gz`. Partitions are rewritten
+    deterministically (sorted rows, no gzip timestamp): an unchanged season
+    gives identical files.
+    """
+    partitions = {}
+    for path in sorted(glob.glob(os.path.join(history_dir, 'parts', '*.json.gz'))):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for dataset, rows in json.load(f).items():
+                for row in rows:
+                    partitions.setdefault((row.get('saison') or 'inconnue', dataset), []).append(row)
+
+    for (saison, dataset), rows in sorted(partitions.items()):
+        fieldnames = sorted({key for row in rows for key in row})
+        rows.sort(key=lambda row: json.dumps(row, sort_keys=True, ensure_ascii=False))
+        text = io.StringIO()
+        writer = csv.DictWriter(text, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows({k: v if isinstance(v, str) or v is None else json.dumps(v, ensure_ascii=False)
+                          for k, v in row.items()} for row in rows)
+
+        directory = os.path.join(history_dir, f"saison={saison}")
+        os.makedirs(directory, exist_ok=True)
+        filename = os.path.join(directory, f"{dataset}.csv.gz")
+        with open(f"{filename}.tmp", 'wb') as f:
+            f.write(gzip.compress(text.getvalue().encode('utf-8'), mtime=0))
+        os.replace(f"{filename}.tmp", filename)
+
+    print(f"📦 {len(partitions)} partitions written to {history_dir}")
+    return sorted(partitions)
+
+def read_partition(saison, dataset, history_dir=HISTORY_DIR):
+    """Rows of a season partition."""
+    with gzip.open(os.path.join(history_dir, f"saison={saison}", f"{dataset}.csv.gz"), 'rt', encoding='utf-8', newline='') as f:
+        return list(csv.DictReader(f))
+
+def main():
+    """Backfill the club's history (players and teams) into data/history/."""
+    parser = argparse.ArgumentParser(description="Rattrapage de l'historique du club, saison par saison")
+    parser.add_argument("--max-requests", type=int, help="Nombre maximum de requêtes pour cette exécution")
+    parser.add_argument("--rate", type=float, default=MAX_REQUESTS_PER_SECOND, help="Requêtes par seconde")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="Tâches en parallèle")
+    parser.add_argument("--restart", action="store_true", help="Oublie les tâches déjà faites (nouveau rattrapage complet)")
+    args = parser.parse_args()
+
+    # Initialize FFTT client
+    try:
+        client = FFTTApiClient(
+            app_id=os.environ['FFTT_APP_ID'],
+            password=os.environ['FFTT_PASSWORD'],
+            serie=os.environ.get('FFTT_SERIE'),
+            max_requests_per_second=args.rate
+        )
+    except KeyError:
+        print("❌ Environment variables FFTT_APP_ID and FFTT_PASSWORD are required")
+        sys.exit(1)
+
+    # USFTT club number
+    club_number = "08940073"
+
+    if args.restart:
+        shutil.rmtree(os.path.join(HISTORY_DIR, 'parts'), ignore_errors=True)
+
+    try:
+        print("📍 Fetching équipes and licences du club...")
+        seasons = record_season_teams(fetch_club_teams(client, club_number), season_of(date.today()))
+        licences = [lic['licence'] for lic in fetch_licenses(client, club_number)]
+
+        jobs = [player_job(licence) for licence in licences] + poule_jobs(seasons)
+
+        remaining = run_jobs(client, jobs, max_workers=args.workers, max_requests=args.max_requests)
+        compact()
+
+        print(f"\n🏁 {client.request_count} API requests")
+        if remaining:
+            print(f"⏸️  {remaining} jobs left, run again to resume")
+
+    except Exception as e:
+        print(f"❌ Error occurred: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 import hashlib
 import hmac
+import copy
+import threading
 import time
 import random
 import string
@@ -9,9 +11,33 @@ import argparse
 import json
 import sys
 import os
+import urllib.parse
+from concurrent.futures import Future
 from pathlib import Path
 
 
+# ============================================================
+# ⏱️ Limitation du débit de requêtes
+# ============================================================
+
+class RateLimiter:
+    """Limite le débit de requêtes, partagé entre tous les threads qui l'utilisent."""
+
+    def __init__(self, max_per_second: float):
+        self.interval = 1.0 / max_per_second
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        """Bloque jusqu'au prochain créneau disponible."""
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
 # ============================================================
 # 🧠 Classe principale du client FFTT
 # ============================================================
@@ -19,16 +45,23 @@ from pathlib import Path
 class FFTTApiClient:
     BASE_URL = "http://www.fftt.com/mobile/pxml/"
 
-    def __init__(self, app_id: str, password: str, serie: str = None):
+    def __init__(self, app_id: str, password: str, serie: str = None,
+                 max_requests_per_second: float = None, cache: bool = False):
         """
         Initialise le client API FFTT.
         :param app_id: Identifiant d’application fourni par la FFTT (ex: "A001")
         :param password: Mot de passe FFTT pour le chiffrement
         :param serie: Numéro de série utilisateur (15 caractères alphanumériques)
+        :param max_requests_per_second: Débit maximum, partagé par tous les threads utilisant le client
+        :param cache: Mémorise les réponses le temps de vie du client (une même requête n'est faite qu'une fois)
         """
         self.app_id = app_id
         self.password = password
         self.serie = serie or self._generate_serie()
+        self.rate_limiter = RateLimiter(max_requests_per_second) if max_requests_per_second else None
+        self._cache = {} if cache else None
+        self._cache_lock = threading.Lock()
+        self.request_count = 0
 
     # ------------------------------------------------------------
     # 🔐 Authentification & sécurité
@@ -70,7 +103,11 @@ class FFTTApiClient:
         # Prepare request and print full URL with params
         prepared_request = requests.Request('GET', url, params=params).prepare()
         # print(f"🌐 Calling: {prepared_request.url}")
-        
+
+        if self.rate_limiter:
+            self.rate_limiter.wait()
+        with self._cache_lock:
+            self.request_count += 1
         response = requests.get(url, params=params, timeout=10)
         response.raise_for_status()
         return ET.fromstring(response.text)
@@ -95,8 +132,26 @@ class FFTTApiClient:
 
     def _get_dict(self, endpoint: str, **kwargs) -> dict:
         """Exécute la requête et retourne le résultat en dictionnaire."""
-        xml_data = self._get(endpoint, **kwargs)
-        return self._xml_to_dict(xml_data)
+        if self._cache is None:
+            xml_data = self._get(endpoint, **kwargs)
+            return self._xml_to_dict(xml_data)
+
+        # Requests in flight are shared too: concurrent callers wait for the first one
+        key = (endpoint, tuple(sorted(kwargs.items())))
+        with self._cache_lock:
+            future = self._cache.get(key)
+            owner = future is None
+            if owner:
+                future = self._cache[key] = Future()
+        if owner:
+            try:
+                future.set_result(self._xml_to_dict(self._get(endpoint, **kwargs)))
+            except Exception as e:
+                with self._cache_lock:
+                    del self._cache[key]
+                future.set_exception(e)
+        # Callers mutate the returned dicts: each one gets its own copy
+        return copy.deepcopy(future.result())
 
     # ------------------------------------------------------------
     # 📘 Fonctions d’accès aux endpoints FFTT
@@ -141,6 +196,14 @@ class FFTTApiClient:
     def rencontre_equipes(self, poule: str):
         return self._get_dict("xml_rencontre_equ", poule=poule)
 
+    def rencontre_detail(self, lien: str):
+        """Récupère la feuille de match d'une rencontre.
+
+        Args:
+            lien: Champ `lien` d'un tour de rencontre_equipes (renc_id, is_retour, phase, equip_1, ...)
+        """
+        return self._get_dict("xml_chp_renc", **dict(urllib.parse.parse_qsl(lien)))
+
     def classement_poule(self, poule: str, division: str):
         """Récupère le classement d'une poule.
 
@@ -151,18 +214,42 @@ class FFTTApiClient:
         return self._get_dict("xml_result_equ", action="classement", auto="1", D1=division, cx_poule=poule)
 
 
+def as_list(value) -> list:
+    """Normalise un nœud XML répété : l'API renvoie un dict seul, une liste ou '\\n' si vide."""
+    if isinstance(value, list):
+        return value
+    if isinstance(value, dict):
+        return [value]
+    return []
+
+
 # ============================================================
 # 🧰 Interface CLI
 # ============================================================
 
 def main():
     parser = argparse.ArgumentParser(description="Client CLI pour l'API FFTT Smartping 2.0")
-    parser.add_argument("endpoint", help="Nom du point d'accès (ex: club_dep, joueur_detail, etc.)")
-    parser.add_argument("params", nargs="*", help="Paramètres clé=valeur (ex: dep=75 ou licence=1234567)")
+    parser.add_argument("endpoint", help="Nom du point d'accès (ex: club_dep, joueur_detail, etc.) ou 'search'")
+    parser.add_argument("params", nargs="*", help="Paramètres clé=valeur (ex: dep=75 ou licence=1234567) ou nom recherché")
     parser.add_argument("--json", action="store_true", help="Affiche le résultat au format JSON")
+    parser.add_argument("--limit", type=int, default=10, help="Nombre de résultats de 'search'")
 
     args = parser.parse_args()
 
+    # Recherche locale par nom (index construit par name_index.py, sans appel API)
+    if args.endpoint == "search":
+        from name_index import NameIndex
+        start = time.perf_counter()
+        results = NameIndex().search(" ".join(args.params), limit=args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+        if args.json:
+            print(json.dumps(results, indent=2, ensure_ascii=False))
+        else:
+            for r in results:
+                print(f"{r['score']:.2f}  {r['licence']:>8}  {r['nom']} {r['prenom']} - {r['nomclub']} ({r['pointm'] or r['point'] or '?'} pts)")
+            print(f"🔎 {len(results)} résultat(s) en {elapsed:.1f} ms")
+        return
+
     # Initialize FFTT client
     try:
         client = FFTTApiClient(
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+
+from fftt import FFTTApiClient, as_list
+from concurrent.futures import ThreadPoolExecutor
+
+import os
+import sys
+import mmap
+import struct
+import argparse
+import numpy as np
+import pandas as pd
+
+# Nombre maximum de clubs interrogés en parallèle
+MAX_WORKERS = 8
+
+# Débit partagé par tous les threads du crawl (un appel par club de la fédération)
+MAX_REQUESTS_PER_SECOND = 4
+
+INDEX_DIR = os.path.join('data', 'licences_index')
+INDEX_FILE = 'licences.idx'
+
+DEPARTMENT_FIELDS = ['licence', 'nom', 'prenom', 'numclub', 'nomclub', 'sexe', 'cat', 'point', 'pointm']
+
+# Index file layout:
+#   header  | magic, record count, records offset, strings offset
+#   keys    | uint32 licence numbers, sorted (contiguous for binary search)
+#   records | fixed-width RECORD_DTYPE, same order as keys
+#   strings | NUL-terminated UTF-8 strings referenced by offset from the records
+MAGIC = b'LICIDX01'
+HEADER = struct.Struct('<8sQQQ')
+RECORD_DTYPE = np.dtype([
+    ('nom', '<u4'),
+    ('prenom', '<u4'),
+    ('nomclub', '<u4'),
+    ('numclub', 'S8'),
+    ('sexe', 'S1'),
+    ('cat', 'S5'),
+    ('point', '<f4'),
+    ('pointm', '<f4'),
+])
+
+# ------------------------------------------------------------
+# 🕸️ Crawl des licences par département
+# ------------------------------------------------------------
+def crawl_department(client, dep, max_workers=MAX_WORKERS):
+    """Fetch the licences of every club of a department."""
+    clubs = as_list((client.club_dep(dep).get('liste') or {}).get('club'))
+    print(f"🏢 {len(clubs)} clubs found in department {dep}")
+
+    def fetch(club):
+        try:
+            liste = client.licences_club(club['numero']).get('liste')
+        except Exception as e:
+            print(f"⚠️  Warning: Could not fetch licences for club {club.get('numero')}: {e}")
+            return []
+        return as_list(liste.get('licence')) if isinstance(liste, dict) else []
+
+    licences = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for club_licences in executor.map(fetch, clubs):
+            licences.extend({k: lic.get(k) or '' for k in DEPARTMENT_FIELDS} for lic in club_licences)
+    return licences
+
+def save_department(licences, dep, index_dir=INDEX_DIR):
+    """Save the crawled licences of a department (input of the incremental rebuild)."""
+    os.makedirs(os.path.join(index_dir, 'deps'), exist_ok=True)
+    filename = os.path.join(index_dir, 'deps', f"{dep}.csv")
+    pd.DataFrame(licences, columns=DEPARTMENT_FIELDS).to_csv(f"{filename}.tmp", index=False)
+    os.replace(f"{filename}.tmp", filename)
+    print(f"📝 {len(licences)} licences saved to {filename}")
+
+# ------------------------------------------------------------
+# 🏗️ Construction de l'index binaire
+# ------------------------------------------------------------
+def build_index(index_dir=INDEX_DIR):
+    """Merge all department files into the sorted, memory-mappable index file."""
+    deps_dir = os.path.join(index_dir, 'deps')
+    files = sorted(f for f in os.listdir(deps_dir) if f.endswith('.csv')) if os.path.isdir(deps_dir) else []
+    frames = [pd.read_csv(os.path.join(deps_dir, f), dtype=str, keep_default_na=False) for f in files]
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=DEPARTMENT_FIELDS)
+
+    # Licence numbers are numeric; a licence seen in several departments keeps its last occurrence
+    df = df[df['licence'].str.fullmatch(r'\d+')]
+    df = df.assign(key=df['licence'].astype(np.uint32)).drop_duplicates('key', keep='last').sort_values('key')
+
+    strings = bytearray()
+    interned = {}
+
+    def intern(value):
+        if value not in interned:
+            interned[value] = len(strings)
+            strings.extend(value.encode('utf-8') + b'\0')
+        return interned[value]
+
+    records = np.zeros(len(df), dtype=RECORD_DTYPE)
+    for field in ('nom', 'prenom', 'nomclub'):
+        records[field] = [intern(v) for v in df[field]]
+    for field in ('numclub', 'sexe', 'cat'):
+        records[field] = [v.encode('utf-8')[:RECORD_DTYPE[field].itemsize] for v in df[field]]
+    for field in ('point', 'pointm'):
+        records[field] = pd.to_numeric(df[field], errors='coerce').to_numpy(dtype=np.float32)
+
+    keys = df['key'].to_numpy(dtype='<u4')
+    records_offset = HEADER.size + keys.nbytes
+    strings_offset = records_offset + records.nbytes
+
+    # Write then rename: readers keep mapping the previous file until they reopen
+    filename = os.path.join(index_dir, INDEX_FILE)
+    with open(f"{filename}.tmp", 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(keys), records_offset, strings_offset))
+        f.write(keys.tobytes())
+        f.write(records.tobytes())
+        f.write(strings)
+    os.replace(f"{filename}.tmp", filename)
+    print(f"📦 {len(keys)} licences indexed in {filename}")
+    return len(keys)
+
+# ------------------------------------------------------------
+# 🔎 Lecture de l'index (mmap, lecture seule)
+# ------------------------------------------------------------
+class LicenceIndex:
+    """Read-only, memory-mapped licence index with binary search lookups.
+
+    Opening the index does not parse anything: the OS pages the file in on demand
+    and shares those pages between all processes mapping it.
+    """
+
+    def __init__(self, path=os.path.join(INDEX_DIR, INDEX_FILE)):
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, records_offset, self._strings_offset = HEADER.unpack_from(self._mm)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a licence index")
+        self._keys = np.frombuffer(self._mm, dtype='<u4', count=count, offset=HEADER.size)
+        self._records = np.frombuffer(self._mm, dtype=RECORD_DTYPE, count=count, offset=records_offset)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, licence):
+        return self._position(licence) is not None
+
+    def _position(self, licence):
+        try:
+            key = np.uint32(int(licence))
+        except (TypeError, ValueError, OverflowError):
+            return None
+        # Search with a uint32 scalar: a Python int would make numpy copy the keys to int64
+        i = int(np.searchsorted(self._keys, key))
+        return i if i < len(self._keys) and self._keys[i] == key else None
+
+    def _string(self, offset):
+        start = self._strings_offset + int(offset)
+        return self._mm[start:self._mm.find(b'\0', start)].decode('utf-8')
+
+    def record(self, position):
+        """Return the record stored at a given position as a dict."""
+        r = self._records[position]
+        return {
+            'licence': str(self._keys[position]),
+            'nom': self._string(r['nom']),
+            'prenom': self._string(r['prenom']),
+            'numclub': r['numclub'].decode('utf-8'),
+            'nomclub': self._string(r['nomclub']),
+            'sexe': r['sexe'].decode('utf-8'),
+            'cat': r['cat'].decode('utf-8'),
+            'point': None if np.isnan(r['point']) else float(r['point']),
+            'pointm': None if np.isnan(r['pointm']) else float(r['pointm']),
+        }
+
+    def get(self, licence):
+        """Return the record of a licence, None if unknown."""
+        position = self._position(licence)
+        return None if position is None else self.record(position)
+
+    def close(self):
+        self._keys = self._records = None
+        self._mm.close()
+
+# ============================================================
+# 🧰 Interface CLI
+# ============================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Index des licences FFTT (fichier binaire mappé en mémoire)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="Crawle les départements donnés puis reconstruit l'index")
+    build.add_argument("deps", nargs="*", help="Départements à (re)crawler (ex: 94 75); aucun = fusion seule")
+    build.add_argument("--rate", type=float, default=MAX_REQUESTS_PER_SECOND, help="Requêtes par seconde")
+    lookup = subparsers.add_parser("lookup", help="Recherche une ou plusieurs licences")
+    lookup.add_argument("licences", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "lookup":
+        index = LicenceIndex()
+        for licence in args.licences:
+            print(index.get(licence) or f"❌ Licence inconnue : {licence}")
+        return
+
+    if args.deps:
+        try:
+            client = FFTTApiClient(
+                app_id=os.environ['FFTT_APP_ID'],
+                password=os.environ['FFTT_PASSWORD'],
+                serie=os.environ.get('FFTT_SERIE'),
+                max_requests_per_second=args.rate
+            )
+        except KeyError:
+            print("❌ Environment variables FFTT_APP_ID and FFTT_PASSWORD are required")
+            sys.exit(1)
+
+        for dep in args.deps:
+            save_department(crawl_department(client, dep), dep)
+
+    build_index()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+from licence_index import LicenceIndex, INDEX_DIR, INDEX_FILE
+
+import os
+import re
+import time
+import argparse
+import unicodedata
+import numpy as np
+
+NAMES_DIR = os.path.join(INDEX_DIR, 'names')
+
+# Candidats re-classés (préfixe, mot exact) pour chaque résultat demandé
+RERANK_FACTOR = 5
+PREFIX_BONUS = 0.3
+EXACT_WORD_BONUS = 0.2
+
+def fold(text):
+    """Lowercase, strip accents and punctuation: 'Émeric D'Alès' -> 'emeric d ales'."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', stripped.lower()).split())
+
+def trigrams(text):
+    """Distinct trigrams of each word of a folded text, padded to match word boundaries."""
+    grams = set()
+    for word in text.split():
+        padded = f" {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def build_name_index(licence_index, names_dir=NAMES_DIR):
+    """Build the trigram inverted index over nom/prenom of a LicenceIndex."""
+    postings = {}
+    licences = np.zeros(len(licence_index), dtype=np.uint32)
+    gram_counts = np.zeros(len(licence_index), dtype=np.uint16)
+
+    for position in range(len(licence_index)):
+        record = licence_index.record(position)
+        grams = trigrams(fold(f"{record['nom']} {record['prenom']}"))
+        licences[position] = int(record['licence'])
+        gram_counts[position] = len(grams)
+        for gram in grams:
+            postings.setdefault(gram, []).append(position)
+
+    grams = sorted(postings)
+    offsets = np.zeros(len(grams) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(postings[g]) for g in grams])
+    flat = np.fromiter((p for g in grams for p in postings[g]), dtype=np.int32, count=int(offsets[-1]))
+
+    os.makedirs(names_dir, exist_ok=True)
+    arrays = {'grams': np.array(grams, dtype='U3'), 'offsets': offsets, 'postings': flat,
+              'licences': licences, 'gram_counts': gram_counts}
+    for name, array in arrays.items():
+        np.save(os.path.join(names_dir, f"{name}.npy"), array)
+    print(f"🔤 {len(licences)} names, {len(grams)} trigrams indexed in {names_dir}")
+
+class NameIndex:
+    """Fuzzy player name search (trigram Dice similarity + prefix bonus).
+
+    Arrays are memory-mapped on the first search only, so importing or creating
+    the index costs nothing for callers that never search.
+    """
+
+    def __init__(self, names_dir=NAMES_DIR, licence_index_path=os.path.join(INDEX_DIR, INDEX_FILE)):
+        self.names_dir = names_dir
+        self.licence_index_path = licence_index_path
+        self._arrays = None
+        self._licence_index = None
+
+    def _load(self):
+        if self._arrays is None:
+            self._arrays = {name: np.load(os.path.join(self.names_dir, f"{name}.npy"), mmap_mode='r')
+                            for name in ('grams', 'offsets', 'postings', 'licences', 'gram_counts')}
+            self._licence_index = LicenceIndex(self.licence_index_path)
+        return self._arrays
+
+    def search(self, query, limit=10):
+        """Return up to `limit` licence records ranked by similarity, each with a 'score' key."""
+        arrays = self._load()
+        folded_query = fold(query)
+        query_grams = trigrams(folded_query)
+        if not query_grams:
+            return []
+
+        grams = arrays['grams']
+        lists = []
+        for gram in query_grams:
+            i = int(np.searchsorted(grams, gram))
+            if i < len(grams) and grams[i] == gram:
+                lists.append(arrays['postings'][arrays['offsets'][i]:arrays['offsets'][i + 1]])
+        if not lists:
+            return []
+
+        candidates = np.concatenate(lists)
+        common = np.bincount(candidates, minlength=len(arrays['licences']))
+        scores = 2.0 * common / (len(query_grams) + arrays['gram_counts'])
+
+        nb_candidates = min(limit * RERANK_FACTOR, int(np.count_nonzero(common)))
+        top = np.argpartition(-scores, nb_candidates - 1)[:nb_candidates]
+
+        results = []
+        query_words = folded_query.split()
+        for position in top:
+            record = self._licence_index.get(arrays['licences'][position])
+            if record is None:
+                continue
+            words = fold(f"{record['nom']} {record['prenom']}").split()
+            score = float(scores[position])
+            if all(any(w.startswith(q) for w in words) for q in query_words):
+                score += PREFIX_BONUS
+            score += EXACT_WORD_BONUS * sum(q in words for q in query_words) / len(query_words)
+            results.append(dict(record, score=round(score, 4)))
+
+        results.sort(key=lambda r: (-r['score'], r['nom'], r['prenom']))
+        return results[:limit]
+
+# ============================================================
+# 🧰 Interface CLI
+# ============================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Index de recherche des joueurs par nom")
+    parser.add_argument("command", choices=["build"], help="Construit l'index à partir de l'index des licences")
+    parser.parse_args()
+
+    start = time.perf_counter()
+    build_name_index(LicenceIndex())
+    print(f"⏱️  Done in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
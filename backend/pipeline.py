@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+
+from fftt import FFTTApiClient
+from usftt_results import (build_competitors, fetch_competitors_parties, fetch_licenses,
+                           save_competitors_to_csv, save_licenses_to_csv)
+from usftt_results_teams import (RANKING_CHECK_DAYS, build_team_rows, fetch_club_teams, fetch_poules,
+                                 parse_division_link, resolve_poules_standings, save_rencontres_to_csv)
+from usftt_results_sheets import build_sheet_rows, collect_club_matches, fetch_sheets, save_sheets_to_csv
+from poule_simulation import save_simulations_to_csv, simulate_poules, simulation_inputs
+from refresh_planner import load_state, plan_refresh, record_full_sweep
+from snapshots import SnapshotStore
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date
+
+import os
+import sys
+import glob
+import json
+import time
+import shutil
+import hashlib
+import argparse
+
+# Débit maximum partagé par toutes les étapes (un seul client, un seul budget)
+MAX_REQUESTS_PER_SECOND = 10
+
+# Requêtes parallèles à l'intérieur d'une étape (ex: parties de chaque joueur)
+MAX_WORKERS = 4
+
+STATE_DIR = os.path.join('data', 'cache', 'pipeline')
+EXPORT_DIR = os.path.join('..', 'frontend', 'public', 'backend')
+
+# ============================================================
+# 🧩 Ordonnanceur
+# ============================================================
+
+class Stage:
+    """A pipeline step computing its `outputs` artifacts from its `inputs` artifacts.
+
+    `func` receives the inputs as keyword arguments and returns the output value
+    (or a dict of values when the stage has several outputs). Stages with
+    `always=True` read remote data and run on every execution; the others are
+    skipped when their inputs did not change since their last run. When the
+    output also depends on the date, `period` returns the current period (e.g.
+    the month): a new period runs the stage again.
+    """
+
+    def __init__(self, name, func, inputs=(), outputs=(), always=False, period=None):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.always = always
+        self.period = period
+
+def load_artifact(name, state_dir=STATE_DIR):
+    """Artifact stored by a previous run, None if there is none."""
+    try:
+        with open(os.path.join(state_dir, f"{name}.json"), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def fingerprint(value):
+    """Content hash of a JSON-serializable artifact."""
+    return hashlib.sha1(json.dumps(value, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')).hexdigest()
+
+class Pipeline:
+    """Dependency graph of stages, executed concurrently along its branches."""
+
+    def __init__(self, stages, state_dir=STATE_DIR):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_dir = state_dir
+
+        producers = {}
+        for stage in stages:
+            for output in stage.outputs:
+                if output in producers:
+                    raise ValueError(f"Artifact '{output}' produced by both '{producers[output]}' and '{stage.name}'")
+                producers[output] = stage.name
+        self.dependencies = {}
+        for stage in stages:
+            missing = [i for i in stage.inputs if i not in producers]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' needs unknown artifacts: {', '.join(missing)}")
+            self.dependencies[stage.name] = {producers[i] for i in stage.inputs}
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        remaining = {name: set(deps) for name, deps in self.dependencies.items()}
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Cycle between stages: {', '.join(sorted(remaining))}")
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+    # ------------------------------------------------------------
+    # 💾 Persistance des artefacts et de l'état
+    # ------------------------------------------------------------
+    def _artifact_path(self, name):
+        return os.path.join(self.state_dir, f"{name}.json")
+
+    def _load_state(self):
+        try:
+            with open(os.path.join(self.state_dir, 'state.json'), encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_state(self, state):
+        os.makedirs(self.state_dir, exist_ok=True)
+        with open(os.path.join(self.state_dir, 'state.json'), 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+
+    def _save_artifact(self, name, value):
+        os.makedirs(self.state_dir, exist_ok=True)
+        path = self._artifact_path(name)
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(value, f, ensure_ascii=False, default=str)
+        os.replace(f"{path}.tmp", path)
+
+    def _load_artifact(self, name):
+        return load_artifact(name, self.state_dir)
+
+    # ------------------------------------------------------------
+    # ▶️ Exécution
+    # ------------------------------------------------------------
+    def _run_stage(self, stage, inputs, inputs_key, previous, force):
+        """Run (or skip) a stage. Returns (status, outputs, duration)."""
+        start = time.perf_counter()
+        unchanged = (previous is not None and previous.get('inputs') == inputs_key
+                     and all(os.path.exists(self._artifact_path(o)) for o in stage.outputs))
+        if unchanged and not stage.always and not force:
+            return 'skipped', {o: self._load_artifact(o) for o in stage.outputs}, 0.0
+
+        result = stage.func(**inputs)
+        outputs = result if len(stage.outputs) != 1 else {stage.outputs[0]: result}
+        for name in stage.outputs:
+            self._save_artifact(name, outputs[name])
+        return 'ran', {o: outputs[o] for o in stage.outputs}, time.perf_counter() - start
+
+    def run(self, max_workers=None, force=False):
+        """Execute all stages; returns a dict stage name -> status ('ran', 'skipped', 'failed', 'blocked')."""
+        state = self._load_state()
+        artifacts = {}
+        hashes = {}
+        statuses = {}
+        pending = dict(self.stages)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=max_workers or len(self.stages) or 1) as executor:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    deps = self.dependencies[name]
+                    if any(statuses.get(d) in ('failed', 'blocked') for d in deps):
+                        statuses[name] = 'blocked'
+                        del pending[name]
+                    elif all(statuses.get(d) in ('ran', 'skipped') for d in deps):
+                        inputs = {i: artifacts[i] for i in stage.inputs}
+                        inputs_key = fingerprint([hashes[i] for i in stage.inputs] +
+                                                 ([stage.period()] if stage.period else []))
+                        future = executor.submit(self._run_stage, stage, inputs, inputs_key, state.get(name), force)
+                        running[future] = (name, inputs_key)
+                        del pending[name]
+                        print(f"▶️  {name}")
+
+                if not running:
+                    continue
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name, inputs_key = running.pop(future)
+                    try:
+                        status, outputs, duration = future.result()
+                    except Exception as e:
+                        print(f"❌ {name} failed: {e}")
+                        statuses[name] = 'failed'
+                        continue
+                    statuses[name] = status
+                    artifacts.update(outputs)
+                    hashes.update({o: fingerprint(v) for o, v in outputs.items()})
+                    state[name] = {'inputs': inputs_key, 'outputs': {o: hashes[o] for o in outputs}}
+                    print(f"{'✅' if status == 'ran' else '⏭️ '} {name} ({status}, {duration:.1f}s)")
+
+        self._save_state(state)
+        return statuses
+
+# ============================================================
+# 🏓 Étapes du rafraîchissement nocturne
+# ============================================================
+
+def export_csv(export_dir=EXPORT_DIR):
+    """Copy the generated CSV files to the frontend (same as copy-csv.sh)."""
+    os.makedirs(export_dir, exist_ok=True)
+    files = sorted(glob.glob(os.path.join('data', '*.csv')))
+    for filename in files:
+        shutil.copy(filename, export_dir)
+    print(f"✅ {len(files)} CSV files copied to {export_dir}")
+    return [os.path.basename(f) for f in files]
+
+def build_stages(client, club_number, plan=None, state_dir=STATE_DIR):
+    """Stages of both data pipelines (players and teams) on one shared client.
+
+    Without a `plan` (or on a full sweep) everything is fetched again. Otherwise
+    the remote stages only fetch the poules and players of the plan and reuse
+    the artifacts of the previous run for the others (see refresh_planner).
+    """
+    partial = plan is not None and not plan.full_sweep
+
+    def licences():
+        stored = load_artifact('licences', state_dir) if partial else None
+        if stored is not None:
+            return stored
+        all_licenses = fetch_licenses(client, club_number)
+        save_licenses_to_csv(all_licenses, club_number)
+        return all_licenses
+
+    def matches(licences):
+        if not partial:
+            return fetch_competitors_parties(client, licences, MAX_WORKERS)
+        parties = load_artifact('parties', state_dir) or {}
+        planned = [l for l in licences if l.get('licence') in plan.players]
+        parties.update(fetch_competitors_parties(client, planned, MAX_WORKERS))
+        return parties
+
+    def competitors(licences, parties):
+        rows = build_competitors(licences, parties)
+        save_competitors_to_csv(rows, club_number)
+        return rows
+
+    def teams():
+        stored = load_artifact('teams', state_dir) if partial else None
+        if stored is not None:
+            return stored
+        return fetch_club_teams(client, club_number)
+
+    def poules(teams):
+        if not partial:
+            return fetch_poules(client, teams)
+        stored = load_artifact('poules', state_dir) or {}
+        planned = [t for t in teams if parse_division_link(t.get('liendivision', ''))[0] in plan.poules]
+        stored.update(fetch_poules(client, planned))
+        return stored
+
+    def rankings(teams, poules):
+        # Resolved standings (official ranking on penalties) are kept for the API
+        standings = resolve_poules_standings(client, teams, poules)
+        rows = build_team_rows(client, teams, poules, club_number, standings)
+        save_rencontres_to_csv(rows, club_number)
+        return {'rencontres': rows, 'standings': standings}
+
+    def sheets(teams, poules):
+        club_matches = collect_club_matches(teams, poules)
+        rows = build_sheet_rows(club_matches, fetch_sheets(client, [match for _, _, match in club_matches]))
+        save_sheets_to_csv(rows, club_number)
+        return rows
+
+    def simulation(teams, poules, standings):
+        results = simulate_poules(simulation_inputs(teams, poules, standings))
+        save_simulations_to_csv(results, club_number)
+        return [dict(r, p_rangs=r['p_rangs'].tolist()) for r in results]
+
+    def exports(competitors, rencontres, feuilles, simulations):
+        return export_csv()
+
+    def snapshot(csv_files):
+        manifest = SnapshotStore().snapshot()
+        print(f"📸 {len(manifest['files'])} files snapshotted ({manifest['written']} new bytes)")
+        return manifest['date']
+
+    return [
+        Stage('licences', licences, outputs=['licences'], always=True),
+        Stage('matches', matches, inputs=['licences'], outputs=['parties'], always=True),
+        # Month columns (pts_AAMM) and current month matches (virtual points)
+        Stage('competitors', competitors, inputs=['licences', 'parties'], outputs=['competitors'],
+              period=lambda: date.today().strftime('%Y-%m')),
+        Stage('teams', teams, outputs=['teams'], always=True),
+        Stage('poules', poules, inputs=['teams'], outputs=['poules'], always=True),
+        # Periodic classement_poule check of resolve_standings
+        Stage('rankings', rankings, inputs=['teams', 'poules'], outputs=['rencontres', 'standings'],
+              period=lambda: date.today().toordinal() // RANKING_CHECK_DAYS),
+        Stage('sheets', sheets, inputs=['teams', 'poules'], outputs=['feuilles']),
+        Stage('simulation', simulation, inputs=['teams', 'poules', 'standings'], outputs=['simulations']),
+        Stage('exports', exports, inputs=['competitors', 'rencontres', 'feuilles', 'simulations'], outputs=['csv_files']),
+        Stage('snapshot', snapshot, inputs=['csv_files'], outputs=['snapshot'], always=True),
+    ]
+
+def plan_from_artifacts(state_dir=STATE_DIR, now=None):
+    """Refresh plan of this run, from the artifacts stored by the previous ones."""
+    return plan_refresh(
+        load_artifact('teams', state_dir),
+        load_artifact('poules', state_dir),
+        load_artifact('competitors', state_dir),
+        load_artifact('feuilles', state_dir),
+        load_state(),
+        now=now
+    )
+
+def main():
+    """Nightly refresh: both data pipelines in one process."""
+    parser = argparse.ArgumentParser(description="Rafraîchissement complet des données USFTT")
+    parser.add_argument("--force", action="store_true", help="Relance toutes les étapes, même sans changement")
+    parser.add_argument("--full", action="store_true", help="Balayage complet, sans tenir compte du calendrier")
+    args = parser.parse_args()
+
+    # Initialize FFTT client
+    try:
+        client = FFTTApiClient(
+            app_id=os.environ['FFTT_APP_ID'],
+            password=os.environ['FFTT_PASSWORD'],
+            serie=os.environ.get('FFTT_SERIE'),
+            max_requests_per_second=MAX_REQUESTS_PER_SECOND,
+            cache=True
+        )
+    except KeyError:
+        print("❌ Environment variables FFTT_APP_ID and FFTT_PASSWORD are required")
+        sys.exit(1)
+
+    # USFTT club number
+    club_number = "08940073"
+
+    plan = None if args.full else plan_from_artifacts()
+    print(f"🗓️  {plan or 'Full sweep requested'}")
+
+    start = time.perf_counter()
+    statuses = Pipeline(build_stages(client, club_number, plan)).run(force=args.force)
+    print(f"\n🏁 {len(statuses)} stages in {time.perf_counter() - start:.1f}s, {client.request_count} API requests")
+
+    if any(status in ('failed', 'blocked') for status in statuses.values()):
+        print(f"❌ Failed: {', '.join(n for n, s in statuses.items() if s in ('failed', 'blocked'))}")
+        sys.exit(1)
+    if plan is None or plan.full_sweep:
+        record_full_sweep()
+
+if __name__ == "__main__":
+    main()
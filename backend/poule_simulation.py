@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+
+from fftt import FFTTApiClient
+from usftt_results_teams import (MATCH_POINTS, compute_standings, fetch_club_teams, fetch_poules,
+                                 normalize_division, parse_division_link, parse_score, resolve_poules_standings)
+
+import os
+import sys
+import csv
+import time
+import numpy as np
+
+# Modèle de probabilité des rencontres restantes
+PRIOR_PARTIES = 14      # Parties fictives à 50% ajoutées à chaque équipe (≈ une rencontre)
+STRENGTH_SCALE = 8.0    # Pente de la logistique sur l'écart de force (part de parties gagnées)
+DRAW_RATE = 0.15        # Probabilité de nul entre deux équipes de même force
+
+# (montées, descentes) par poule selon la division (normalize_division), d'après
+# les règlements sportifs de la phase ; la dernière division ne descend pas
+MOVEMENTS = {
+    'N1': (1, 3), 'N2': (1, 2), 'N3': (1, 2), 'PN': (1, 2),
+    'R1': (1, 2), 'R2': (1, 2), 'R3': (2, 2), 'PR': (2, 2),
+    'D1': (2, 2), 'D2': (2, 2), 'D3': (2, 2), 'D4': (2, 0),
+}
+DEFAULT_MOVEMENTS = (1, 2)
+
+def build_poule(poule_number, tours, standings=None, division=None):
+    """Build the simulation input of a poule from its rencontre_equipes payload.
+
+    Current points come from `standings` (see resolve_standings), computed from
+    the tours when not given. `division` (e.g. 'D1') sets the number of
+    promotions and relegations (see MOVEMENTS).
+    """
+    standings = standings if standings is not None else compute_standings(tours)
+    teams = []
+    index = {}
+
+    def team_index(name):
+        name = (name or '').strip()
+        if name not in index:
+            index[name] = len(teams)
+            teams.append(name)
+        return index[name]
+
+    played = []
+    remaining = []
+    for tour in tours:
+        home, away = team_index(tour.get('equa')), team_index(tour.get('equb'))
+        if not tour.get('scorea') and not tour.get('scoreb'):
+            remaining.append((home, away))
+            continue
+        score_home, score_away = parse_score(tour.get('scorea')), parse_score(tour.get('scoreb'))
+        if score_home is not None and score_away is not None:
+            played.append((home, away, score_home, score_away))
+    for name in standings:
+        team_index(name)
+
+    points = np.array([parse_score(standings.get(name, {}).get('points')) or 0 for name in teams], dtype=np.float32)
+
+    strengths = team_strengths(len(teams), played)
+    home_idx = np.array([m[0] for m in remaining], dtype=np.int64)
+    away_idx = np.array([m[1] for m in remaining], dtype=np.int64)
+    p_win, p_draw = match_probabilities(strengths[home_idx], strengths[away_idx])
+    nb_montees, nb_descentes = MOVEMENTS.get(division, DEFAULT_MOVEMENTS)
+
+    return {
+        'poule': poule_number,
+        'division': division,
+        'nb_montees': nb_montees,
+        'nb_descentes': nb_descentes,
+        'teams': teams,
+        'points': points,
+        'home': home_idx,
+        'away': away_idx,
+        'p_win': p_win,
+        'p_draw': p_draw,
+    }
+
+def team_strengths(nb_teams, played, prior_parties=PRIOR_PARTIES):
+    """Share of individual games won by each team, shrunk towards 50%."""
+    won = np.full(nb_teams, prior_parties / 2, dtype=np.float64)
+    total = np.full(nb_teams, float(prior_parties), dtype=np.float64)
+    for home, away, score_home, score_away in played:
+        won[home] += score_home
+        won[away] += score_away
+        total[home] += score_home + score_away
+        total[away] += score_home + score_away
+    return won / total
+
+def match_probabilities(strength_home, strength_away, scale=STRENGTH_SCALE, draw_rate=DRAW_RATE):
+    """Return (p_home_win, p_draw) arrays from the teams' strengths."""
+    p_home = 1.0 / (1.0 + np.exp(-scale * (strength_home - strength_away)))
+    p_draw = draw_rate * (1.0 - np.abs(2.0 * p_home - 1.0))
+    return (p_home * (1.0 - p_draw)).astype(np.float32), p_draw.astype(np.float32)
+
+def simulate_poules(poules, n_simulations=100_000, seed=None, batch_size=25_000):
+    """Simulate the remaining fixtures of all poules at once.
+
+    Promotion and relegation probabilities use each poule's own `nb_montees`
+    and `nb_descentes` (see build_poule).
+
+    Poules are padded to the same number of teams/fixtures so that every batch
+    of simulations is a handful of array operations over (poule, simulation, team).
+    """
+    if not poules:
+        return []
+
+    nb_poules = len(poules)
+    max_teams = max(len(p['teams']) for p in poules)
+    max_fixtures = max(max(len(p['home']) for p in poules), 1)
+
+    base_points = np.zeros((nb_poules, 1, max_teams), dtype=np.float32)
+    valid = np.zeros((nb_poules, max_teams), dtype=bool)
+    p_win = np.zeros((nb_poules, 1, max_fixtures), dtype=np.float32)
+    p_draw = np.zeros((nb_poules, 1, max_fixtures), dtype=np.float32)
+    played = np.zeros((nb_poules, 1, max_fixtures), dtype=np.float32)
+    home_incidence = np.zeros((nb_poules, max_fixtures, max_teams), dtype=np.float32)
+    away_incidence = np.zeros((nb_poules, max_fixtures, max_teams), dtype=np.float32)
+
+    for i, poule in enumerate(poules):
+        nb_teams, nb_fixtures = len(poule['teams']), len(poule['home'])
+        base_points[i, 0, :nb_teams] = poule['points']
+        valid[i, :nb_teams] = True
+        p_win[i, 0, :nb_fixtures] = poule['p_win']
+        p_draw[i, 0, :nb_fixtures] = poule['p_draw']
+        played[i, 0, :nb_fixtures] = 1.0
+        home_incidence[i, np.arange(nb_fixtures), poule['home']] = 1.0
+        away_incidence[i, np.arange(nb_fixtures), poule['away']] = 1.0
+
+    p_win_or_draw = p_win + p_draw
+    total_points = MATCH_POINTS['V'] + MATCH_POINTS['D']
+    offsets = ((np.arange(nb_poules)[:, None, None] * max_teams + np.arange(max_teams)) * max_teams)
+    rank_counts = np.zeros(nb_poules * max_teams * max_teams, dtype=np.int64)
+    rng = np.random.default_rng(seed)
+
+    for start in range(0, n_simulations, batch_size):
+        size = min(batch_size, n_simulations - start)
+        draws = rng.random((nb_poules, size, max_fixtures), dtype=np.float32)
+        home_points = np.where(draws < p_win, MATCH_POINTS['V'],
+                               np.where(draws < p_win_or_draw, MATCH_POINTS['N'], MATCH_POINTS['D'])).astype(np.float32)
+        away_points = (total_points - home_points) * played
+        home_points *= played
+
+        points = base_points + home_points @ home_incidence + away_points @ away_incidence
+        # Random tie-break: points are integers, the jitter only orders equal totals
+        points += rng.random(points.shape, dtype=np.float32) * 0.5
+        points[~np.broadcast_to(valid[:, None, :], points.shape)] = -np.inf
+
+        order = np.argsort(-points, axis=-1)
+        ranks = np.argsort(order, axis=-1)
+        indices = (offsets + ranks)[np.broadcast_to(valid[:, None, :], ranks.shape)]
+        rank_counts += np.bincount(indices, minlength=rank_counts.size)
+
+    probabilities = rank_counts.reshape(nb_poules, max_teams, max_teams) / float(n_simulations)
+
+    results = []
+    for i, poule in enumerate(poules):
+        nb_teams, nb_montees, nb_descentes = len(poule['teams']), poule['nb_montees'], poule['nb_descentes']
+        for j, name in enumerate(poule['teams']):
+            p_ranks = probabilities[i, j, :nb_teams]
+            results.append({
+                'poule': poule['poule'],
+                'equipe': name,
+                'points': float(poule['points'][j]),
+                'rang_moyen': float(np.dot(p_ranks, np.arange(1, nb_teams + 1))),
+                'p_montee': float(p_ranks[:nb_montees].sum()),
+                'p_descente': float(p_ranks[max(nb_teams - nb_descentes, nb_montees):].sum()),
+                'p_rangs': p_ranks,
+            })
+    return results
+
+def simulation_inputs(teams, poules, standings):
+    """Build the simulation input of every poule of the club's teams.
+
+    `standings` is the dict poule -> standings of resolve_poules_standings.
+    """
+    inputs = {}
+    for team in teams:
+        poule_number, _ = parse_division_link(team.get('liendivision', ''))
+        if poule_number in poules and poule_number not in inputs:
+            division = normalize_division(team.get('libdivision', ''))
+            inputs[poule_number] = build_poule(poule_number, poules[poule_number], standings.get(poule_number), division)
+    return list(inputs.values())
+
+def save_simulations_to_csv(results, club_number):
+    """Save simulation results to a CSV file (one row per team)."""
+    if not results:
+        return
+
+    os.makedirs('data', exist_ok=True)
+    filename = os.path.join('data', f"simulations_{club_number}.csv")
+    max_teams = max(len(r['p_rangs']) for r in results)
+    fieldnames = ['poule', 'equipe', 'points', 'rang_moyen', 'p_montee', 'p_descente'] + \
+                 [f"p_rang_{rang}" for rang in range(1, max_teams + 1)]
+
+    with open(f"{filename}.tmp", 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+        for r in results:
+            row = {k: r[k] for k in ('poule', 'equipe', 'points')}
+            row.update({k: round(r[k], 4) for k in ('rang_moyen', 'p_montee', 'p_descente')})
+            row.update({f"p_rang_{rang}": round(float(p), 4) for rang, p in enumerate(r['p_rangs'], start=1)})
+            writer.writerow(row)
+    os.replace(f"{filename}.tmp", filename)
+
+    print(f"📝 {len(results)} teams saved to {filename}")
+
+def main():
+    """Simulate the end of the phase for every poule of the club's teams."""
+    # Initialize FFTT client
+    try:
+        client = FFTTApiClient(
+            app_id=os.environ['FFTT_APP_ID'],
+            password=os.environ['FFTT_PASSWORD'],
+            serie=os.environ.get('FFTT_SERIE')
+        )
+    except KeyError:
+        print("❌ Environment variables FFTT_APP_ID and FFTT_PASSWORD are required")
+        sys.exit(1)
+
+    # USFTT club number
+    club_number = "08940073"
+
+    try:
+        print("📍 Fetching équipes du club...")
+        teams = fetch_club_teams(client, club_number)
+        tours = fetch_poules(client, teams)
+        poules = simulation_inputs(teams, tours, resolve_poules_standings(client, teams, tours))
+
+        print(f"\n🎲 Simulating {len(poules)} poules...")
+        start = time.perf_counter()
+        results = simulate_poules(poules)
+        print(f"⏱️  Done in {time.perf_counter() - start:.2f}s")
+
+        save_simulations_to_csv(results, club_number)
+
+    except Exception as e:
+        print(f"❌ Error occurred: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
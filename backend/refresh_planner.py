@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+from usftt_results_teams import extract_team_id, parse_division_link, parse_result
+from name_index import fold
+from datetime import datetime, timedelta
+
+import os
+import json
+
+# Une poule est rafraîchie si elle a joué dans les N derniers jours
+RECENT_DAYS = 3
+# ... ou si une rencontre passée attend encore son résultat (saisie tardive)
+LATE_RESULT_DAYS = 14
+# Balayage complet (licences, équipes, toutes les poules et tous les joueurs)
+FULL_SWEEP_DAYS = 7
+
+STATE_FILE = os.path.join('data', 'cache', 'planner.json')
+
+class RefreshPlan:
+    """What to fetch on this run: everything (full sweep) or only some poules and players."""
+
+    def __init__(self, full_sweep, poules=(), players=(), reason=''):
+        self.full_sweep = full_sweep
+        self.poules = set(poules)
+        self.players = set(players)
+        self.reason = reason
+
+    def __repr__(self):
+        if self.full_sweep:
+            return f"RefreshPlan(full sweep: {self.reason})"
+        return f"RefreshPlan({len(self.poules)} poules, {len(self.players)} players)"
+
+def tour_date(tour):
+    """Date of a rencontre (actual date, planned date otherwise), None if unknown."""
+    for key in ('datereelle', 'dateprevue'):
+        try:
+            return datetime.strptime(tour.get(key) or '', '%d/%m/%Y').date()
+        except ValueError:
+            continue
+    return None
+
+def needs_refresh(tour, today, recent_days=RECENT_DAYS, late_result_days=LATE_RESULT_DAYS):
+    """A rencontre needs a refresh around its date, and while its past result is missing."""
+    date = tour_date(tour)
+    if date is None or date > today:
+        return False
+    if (today - date).days <= recent_days:
+        return True
+    return parse_result(tour.get('scorea'), tour.get('scoreb')) is None and (today - date).days <= late_result_days
+
+def load_state(state_file=STATE_FILE):
+    try:
+        with open(state_file, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def record_full_sweep(now=None, state_file=STATE_FILE):
+    """Remember a successful full sweep."""
+    state = load_state(state_file)
+    state['last_full_sweep'] = (now or datetime.now()).isoformat()
+    os.makedirs(os.path.dirname(state_file), exist_ok=True)
+    with open(state_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+
+def plan_refresh(teams, poules, competitors, feuilles, state, now=None,
+                 recent_days=RECENT_DAYS, full_sweep_days=FULL_SWEEP_DAYS):
+    """Build the refresh plan from the data stored by the previous runs.
+
+    :param teams: club teams (equipes_club), None if never fetched
+    :param poules: dict poule -> tours (rencontre_equipes), None if never fetched
+    :param competitors: competitors rows, None if never fetched
+    :param feuilles: match sheets rows (team_id, joueur_a, joueur_b...), to find who plays in each team
+    :param state: planner state (see load_state)
+    """
+    now = now or datetime.now()
+    today = now.date()
+
+    if teams is None or poules is None or competitors is None:
+        return RefreshPlan(True, reason='no stored data')
+    try:
+        last_full_sweep = datetime.fromisoformat(state['last_full_sweep'])
+    except (KeyError, ValueError):
+        return RefreshPlan(True, reason='no previous full sweep')
+    if now - last_full_sweep >= timedelta(days=full_sweep_days):
+        return RefreshPlan(True, reason=f"last full sweep on {last_full_sweep:%d/%m/%Y}")
+
+    planned_poules = set()
+    active_teams = set()
+    for team in teams:
+        poule_number, _ = parse_division_link(team.get('liendivision', ''))
+        if poule_number not in poules:
+            return RefreshPlan(True, reason=f"new poule {poule_number}")
+        tours = [tour for tour in poules[poule_number] if needs_refresh(tour, today, recent_days)]
+        if tours:
+            planned_poules.add(poule_number)
+        team_name = team.get('libequipe', '').split(' - Phase')[0]
+        if any(team_name in (tour.get('equa'), tour.get('equb')) for tour in tours):
+            active_teams.add(extract_team_id(team.get('libequipe', ''), team.get('libdivision', '')))
+
+    # Players of the teams that just played, known from previous match sheets
+    players_by_name = {fold(f"{c.get('nom')} {c.get('prenom')}"): c['licence'] for c in competitors}
+    planned_players = set()
+    for team_id in active_teams:
+        rows = [row for row in feuilles or [] if row.get('team_id') == team_id]
+        if not rows:
+            # Unknown roster: refresh every player rather than missing some
+            planned_players.update(c['licence'] for c in competitors)
+            break
+        for row in rows:
+            for name in (row.get('joueur_a'), row.get('joueur_b')):
+                licence = players_by_name.get(fold(name))
+                if licence:
+                    planned_players.add(licence)
+
+    return RefreshPlan(False, planned_poules, planned_players)
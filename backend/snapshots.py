@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+
+from datetime import date as Date
+from difflib import SequenceMatcher
+
+import os
+import io
+import csv
+import sys
+import glob
+import json
+import zlib
+import hashlib
+import argparse
+
+SNAPSHOT_DIR = os.path.join('data', 'snapshots')
+
+# Chaque version d'un fichier est stockée comme différence ligne à ligne avec sa
+# version précédente. Une copie complète n'est réécrite que lorsque la chaîne de
+# différences atteint MAX_DELTA_CHAIN versions (la reconstruction d'une date
+# reste bornée), ou qu'une différence pèse plus qu'une copie complète.
+MAX_DELTA_CHAIN = 200
+
+# Objets et versions décodés gardés en mémoire par dépôt
+CACHE_SIZE = 64
+
+def line_delta(old_lines, new_lines):
+    """Row-level delta: [[start, end, new lines], ...] replacing old_lines[start:end]."""
+    matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    return [[i1, i2, new_lines[j1:j2]] for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != 'equal']
+
+def apply_delta(old_lines, ops):
+    """Inverse of line_delta."""
+    lines = []
+    position = 0
+    for start, end, new in ops:
+        lines.extend(old_lines[position:start])
+        lines.extend(new)
+        position = end
+    lines.extend(old_lines[position:])
+    return lines
+
+def encode(obj):
+    return zlib.compress(json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), 9)
+
+class SnapshotStore:
+    """Daily snapshots of the generated CSV files, stored as deduplicated deltas.
+
+    Each version of a file is a zlib-compressed object addressed by its SHA-1 in
+    `objects/`: either the full rows, or a row-level delta against the previous
+    version's object. An unchanged file reuses the previous object, so
+    identical data is stored once. Each run writes a small manifest
+    (`manifests/<date>.json`) with the header and object of every file. A date
+    without manifest reads as the latest snapshot before it.
+    """
+
+    def __init__(self, root=SNAPSHOT_DIR):
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        self.manifests_dir = os.path.join(root, 'manifests')
+        # Objects are immutable (content-addressed): decoded ones are kept per store
+        self._objects = {}
+        self._lines = {}
+
+    # ------------------------------------------------------------
+    # 💾 Écriture
+    # ------------------------------------------------------------
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _write_object(self, data):
+        """Store an encoded object unless already known; returns (hash, stored bytes)."""
+        digest = hashlib.sha1(data).hexdigest()
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            return digest, 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", 'wb') as f:
+            f.write(data)
+        os.replace(f"{path}.tmp", path)
+        return digest, len(data)
+
+    def _previous_files(self, day):
+        """Files of the latest snapshot strictly before `day` (deltas are taken against them)."""
+        earlier = [d for d in self.dates() if d < day]
+        return self._load_manifest(earlier[-1])['files'] if earlier else {}
+
+    def _store_version(self, lines, previous):
+        """Store a file version, as a delta against the `previous` object when worth it."""
+        if previous is not None:
+            if list(self.read_lines(previous)) == lines:
+                return previous, 0
+            base = self.read_object(previous)
+            delta = {'base': previous, 'depth': base.get('depth', 0) + 1,
+                     'ops': line_delta(self.read_lines(previous), lines)}
+            data, full = encode(delta), encode({'lines': lines})
+            return self._write_object(data if delta['depth'] <= MAX_DELTA_CHAIN and len(data) < len(full) else full)
+        return self._write_object(encode({'lines': lines}))
+
+    def snapshot(self, data_dir='data', day=None):
+        """Snapshot every `data_dir/*.csv`; returns the manifest (with the object bytes written)."""
+        day = day or Date.today()
+        previous = self._previous_files(day.isoformat())
+
+        manifest = {'date': day.isoformat(), 'files': {}}
+        written = 0
+        for filename in sorted(glob.glob(os.path.join(data_dir, '*.csv'))):
+            name = os.path.basename(filename)
+            with open(filename, encoding='utf-8', newline='') as f:
+                header = f.readline()
+                lines = f.readlines()
+            digest, size = self._store_version(lines, previous.get(name, {}).get('object'))
+            written += size
+            manifest['files'][name] = {'header': header, 'rows': len(lines), 'object': digest}
+
+        data = json.dumps(manifest, ensure_ascii=False, separators=(',', ':'))
+        os.makedirs(self.manifests_dir, exist_ok=True)
+        path = os.path.join(self.manifests_dir, f"{manifest['date']}.json")
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(f"{path}.tmp", path)
+        return dict(manifest, written=written)
+
+    # ------------------------------------------------------------
+    # 📖 Lecture
+    # ------------------------------------------------------------
+    def dates(self):
+        """Snapshot dates, oldest first."""
+        return sorted(os.path.splitext(os.path.basename(p))[0]
+                      for p in glob.glob(os.path.join(self.manifests_dir, '*.json')))
+
+    def manifest(self, day):
+        """Manifest in effect on `day` (latest snapshot at or before it)."""
+        day = day.isoformat() if isinstance(day, Date) else day
+        candidates = [d for d in self.dates() if d <= day]
+        if not candidates:
+            raise KeyError(f"No snapshot on or before {day}")
+        return self._load_manifest(candidates[-1])
+
+    def _load_manifest(self, day):
+        with open(os.path.join(self.manifests_dir, f"{day}.json"), encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _remember(cache, digest, value):
+        if len(cache) >= CACHE_SIZE:
+            del cache[next(iter(cache))]
+        cache[digest] = value
+        return value
+
+    def read_object(self, digest):
+        if digest in self._objects:
+            return self._objects[digest]
+        with open(self._object_path(digest), 'rb') as f:
+            return self._remember(self._objects, digest, json.loads(zlib.decompress(f.read()).decode('utf-8')))
+
+    def read_lines(self, digest):
+        """Lines of a file version (deltas applied from the last full copy)."""
+        if digest in self._lines:
+            return self._lines[digest]
+        obj = self.read_object(digest)
+        if 'lines' in obj:
+            return self._remember(self._lines, digest, tuple(obj['lines']))
+        return self._remember(self._lines, digest, tuple(apply_delta(self.read_lines(obj['base']), obj['ops'])))
+
+    def _file_entry(self, day, filename):
+        files = self.manifest(day)['files']
+        if filename not in files:
+            raise KeyError(f"{filename} not in the snapshot of {day}")
+        return files[filename]
+
+    def restore(self, day, filename):
+        """Content of `filename` as it was on `day`."""
+        entry = self._file_entry(day, filename)
+        return entry['header'] + ''.join(self.read_lines(entry['object']))
+
+    def rows(self, day, filename):
+        """Rows (dicts) of `filename` as it was on `day`."""
+        return list(csv.DictReader(io.StringIO(self.restore(day, filename))))
+
+    def diff(self, day_a, day_b, filename, key):
+        """Rows added, removed and changed between two dates, by `key` column.
+
+        Lines present in both versions are not parsed.
+        """
+        entry_a, entry_b = self._file_entry(day_a, filename), self._file_entry(day_b, filename)
+        lines_a, lines_b = self.read_lines(entry_a['object']), self.read_lines(entry_b['object'])
+        shared = set(lines_a) & set(lines_b) if entry_a['header'] == entry_b['header'] else set()
+
+        def changed_rows(entry, lines):
+            text = entry['header'] + ''.join(line for line in lines if line not in shared)
+            return {row[key]: row for row in csv.DictReader(io.StringIO(text))}
+
+        rows_a, rows_b = changed_rows(entry_a, lines_a), changed_rows(entry_b, lines_b)
+        return {
+            'added': [rows_b[k] for k in rows_b if k not in rows_a],
+            'removed': [rows_a[k] for k in rows_a if k not in rows_b],
+            'changed': [(rows_a[k], rows_b[k]) for k in rows_a if k in rows_b and rows_a[k] != rows_b[k]],
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Historique des fichiers CSV générés")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("save", help="Snapshot data/*.csv for today")
+    subparsers.add_parser("list", help="List snapshot dates")
+
+    show = subparsers.add_parser("show", help="Print a file as it was on a date")
+    show.add_argument("date", help="YYYY-MM-DD")
+    show.add_argument("filename", help="e.g. competitors_08940073.csv")
+
+    diff = subparsers.add_parser("diff", help="Rows changed between two dates")
+    diff.add_argument("date_a", help="YYYY-MM-DD")
+    diff.add_argument("date_b", help="YYYY-MM-DD")
+    diff.add_argument("filename", help="e.g. competitors_08940073.csv")
+    diff.add_argument("--key", default="licence", help="Column identifying a row")
+
+    args = parser.parse_args()
+    store = SnapshotStore()
+
+    try:
+        if args.command == "save":
+            manifest = store.snapshot()
+            print(f"📸 {len(manifest['files'])} files snapshotted on {manifest['date']} ({manifest['written']} new bytes)")
+        elif args.command == "list":
+            print('\n'.join(store.dates()))
+        elif args.command == "show":
+            sys.stdout.write(store.restore(args.date, args.filename))
+        else:
+            changes = store.diff(args.date_a, args.date_b, args.filename, args.key)
+            for row in changes['added']:
+                print(f"+ {row}")
+            for row in changes['removed']:
+                print(f"- {row}")
+            for old, new in changes['changed']:
+                print(f"~ {args.key}={old[args.key]}: " +
+                      ', '.join(f"{k}: {old[k]} → {new[k]}" for k in new if old.get(k) != new[k]))
+    except KeyError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+
+import asyncio
+import gzip
+import json
+import sys
+import os
+
+# Add parent directory to path to import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api_server import ApiServer, DataState, respond
+
+
+def write_csv(filename, header, rows):
+    with open(filename, 'w', encoding='utf-8', newline='') as f:
+        f.write(header + '\n' + ''.join(row + '\n' for row in rows))
+
+
+def write_outputs(data_dir, nb_players=100):
+    os.makedirs(data_dir, exist_ok=True)
+    write_csv(os.path.join(data_dir, 'licenses_1.csv'), 'licence,nom,prenom,sexe,type',
+              [f"{i},NOM{i:03d},Prenom,{'F' if i % 4 == 0 else 'M'},{'T' if i % 2 else 'P'}" for i in range(nb_players)])
+    write_csv(os.path.join(data_dir, 'competitors_1.csv'), 'licence,nom,prenom,point',
+              [f"{i},NOM{i:03d},Prenom,{500 + i}" for i in range(1, nb_players, 2)])
+    write_csv(os.path.join(data_dir, 'rencontres_1.csv'),
+              'team_id,team_name,division,poule,rang,points,joues,victoires,nuls,defaites,forfaits,tour,equipe_domicile,equipe_exterieur',
+              ['1G,USFTT 1 - Phase 1,N2,10,2,9,3,2,1,0,0,1,USFTT 1,A',
+               '1G,USFTT 1 - Phase 1,N2,10,2,9,3,2,1,0,0,2,B,USFTT 1',
+               '3G,USFTT 3 - Phase 1,D1,20,N/A,N/A,0,0,0,0,0,1,USFTT 3,D',
+               '2G,USFTT 2 - Phase 1,D1,20,1,12,4,4,0,0,0,1,USFTT 2,C'])
+
+
+def make_state(tmp_path, poules=None, standings=None):
+    state_dir = tmp_path / 'pipeline'
+    state_dir.mkdir(exist_ok=True)
+    if poules is not None:
+        (state_dir / 'poules.json').write_text(json.dumps(poules), encoding='utf-8')
+    if standings is not None:
+        (state_dir / 'standings.json').write_text(json.dumps(standings), encoding='utf-8')
+    write_outputs(str(tmp_path / 'data'))
+    return DataState(str(tmp_path / 'data'), '1', str(state_dir))
+
+
+def get(state, target, headers=None):
+    status, response_headers, body = respond(state, 'GET', target, headers or {})
+    if response_headers.get('Content-Encoding') == 'gzip':
+        body = gzip.decompress(body)
+    return status, response_headers, json.loads(body) if body else None
+
+
+class TestRoutes:
+    """Test cases for the API routes."""
+
+    def test_player(self, tmp_path):
+        """Test that licence and competitor data are merged."""
+        state = make_state(tmp_path)
+        status, _, player = get(state, '/players/3')
+
+        assert status == 200
+        assert player == {'licence': '3', 'nom': 'NOM003', 'prenom': 'Prenom', 'sexe': 'M', 'type': 'T', 'point': '503'}
+        assert get(state, '/players/999')[0] == 404
+
+    def test_filtered_list_and_pagination(self, tmp_path):
+        """Test column filters, offset and limit."""
+        state = make_state(tmp_path)
+        _, _, page = get(state, '/players?sexe=F&type=P&offset=5&limit=10')
+
+        assert page['total'] == 25
+        assert [p['licence'] for p in page['items']] == [str(i) for i in range(20, 60, 4)]
+        assert get(state, '/players?unknown=1')[2]['total'] == 0
+        assert get(state, '/players?limit=abc')[0] == 400
+
+    def test_team(self, tmp_path):
+        """Test that a team gathers its rencontres."""
+        state = make_state(tmp_path)
+        _, _, team = get(state, '/teams/1G')
+
+        assert team['division'] == 'N2'
+        assert [r['tour'] for r in team['rencontres']] == ['1', '2']
+        assert [t['team_id'] for t in get(state, '/teams?division=D1')[2]['items']] == ['3G', '2G']
+
+    def test_standings(self, tmp_path):
+        """Test standings computed from the stored poule, club rows otherwise."""
+        tours = [{'equa': 'USFTT 1', 'equb': 'A', 'scorea': '4', 'scoreb': '10'}]
+        state = make_state(tmp_path, poules={'10': tours})
+
+        assert [r['equipe'] for r in get(state, '/poules/10/standings')[2]] == ['A', 'USFTT 1']
+        # Unranked teams ('N/A') come last
+        assert get(state, '/poules/20/standings')[2] == [
+            {'rang': '1', 'points': '12', 'joues': '4', 'victoires': '4', 'nuls': '0', 'defaites': '0',
+             'forfaits': '0', 'equipe': 'USFTT 2'},
+            {'rang': 'N/A', 'points': 'N/A', 'joues': '0', 'victoires': '0', 'nuls': '0', 'defaites': '0',
+             'forfaits': '0', 'equipe': 'USFTT 3'}]
+
+    def test_resolved_standings(self, tmp_path):
+        """Test that the resolved standings (official ranking on penalties) win over the computed ones."""
+        tours = [{'equa': 'USFTT 1', 'equb': 'A', 'scorea': '10', 'scoreb': '4'}]
+        ranking = {'joues': '1', 'victoires': '1', 'nuls': '0', 'defaites': '0', 'forfaits': '0'}
+        # A is ahead despite the defeat: USFTT 1 got a penalty
+        standings = {'10': {'USFTT 1': dict(ranking, rang='2', points='1'),
+                            'A': dict(ranking, rang='1', points='2', victoires='0', defaites='1')}}
+        state = make_state(tmp_path, poules={'10': tours}, standings=standings)
+
+        assert [(r['equipe'], r['points']) for r in get(state, '/poules/10/standings')[2]] == [('A', '2'), ('USFTT 1', '1')]
+
+    def test_etag_and_gzip(self, tmp_path):
+        """Test conditional requests and compression of large bodies."""
+        state = make_state(tmp_path)
+        status, headers, _ = get(state, '/players?limit=100', {'accept-encoding': 'gzip, deflate'})
+        assert status == 200
+        assert headers['Content-Encoding'] == 'gzip'
+
+        status, _, body = get(state, '/players?limit=100', {'if-none-match': headers['ETag'], 'accept-encoding': 'gzip'})
+        assert status == 304
+        assert body is None
+
+        # Each representation has its own ETag
+        _, identity_headers, _ = get(state, '/players?limit=100')
+        assert identity_headers['ETag'] != headers['ETag']
+        assert get(state, '/players?limit=100', {'if-none-match': headers['ETag']})[0] == 200
+
+        _, refused_headers, _ = get(state, '/players?limit=100', {'accept-encoding': 'gzip;q=0, deflate'})
+        assert 'Content-Encoding' not in refused_headers
+
+        _, small_headers, _ = get(state, '/players/3', {'accept-encoding': 'gzip'})
+        assert 'Content-Encoding' not in small_headers
+
+    def test_head(self, tmp_path):
+        """Test that HEAD sends no body but the GET Content-Length."""
+        state = make_state(tmp_path)
+        _, get_headers, _ = get(state, '/players')
+        status, headers, body = respond(state, 'HEAD', '/players', {})
+
+        assert (status, body) == (200, b'')
+        assert headers['Content-Length'] == get_headers['Content-Length'] != '0'
+
+    def test_method_not_allowed(self, tmp_path):
+        """Test that only GET and HEAD are served."""
+        assert respond(make_state(tmp_path), 'POST', '/players', {})[0] == 405
+
+
+class TestServer:
+    """Test cases for the HTTP server and hot reload."""
+
+    def test_keep_alive_and_reload(self, tmp_path):
+        """Test two requests on one connection, then a reload after new outputs land."""
+        data_dir, state_dir = str(tmp_path / 'data'), str(tmp_path / 'pipeline')
+        write_outputs(data_dir, nb_players=10)
+
+        async def request(reader, writer, target):
+            writer.write(f"GET {target} HTTP/1.1\r\nHost: test\r\n\r\n".encode())
+            await writer.drain()
+            head = (await reader.readuntil(b'\r\n\r\n')).decode()
+            length = int(head.split('Content-Length: ')[1].split('\r\n')[0])
+            return head.split(' ')[1], json.loads(await reader.readexactly(length))
+
+        async def scenario():
+            api = ApiServer(lambda: DataState(data_dir, '1', state_dir), reload_interval=0.01)
+            server = await asyncio.start_server(api.handle_connection, '127.0.0.1', 0)
+            reloader = asyncio.ensure_future(api.reload_forever())
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+
+            first = await request(reader, writer, '/players')
+            missing = await request(reader, writer, '/players/50')
+            write_outputs(data_dir, nb_players=100)
+            os.utime(os.path.join(data_dir, 'licenses_1.csv'), ns=(0, 10 ** 18))
+            for _ in range(200):
+                await asyncio.sleep(0.01)
+                if len(api.state.players.rows) == 100:
+                    break
+            reloaded = await request(reader, writer, '/players/50')
+
+            writer.close()
+            reloader.cancel()
+            server.close()
+            await server.wait_closed()
+            return first, missing, reloaded
+
+        first, missing, reloaded = asyncio.run(scenario())
+
+        assert first[0] == '200' and first[1]['total'] == 10
+        assert missing[0] == '404'
+        assert reloaded[0] == '200' and reloaded[1]['licence'] == '50'
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+from datetime import date
+from unittest.mock import Mock
+
+# Add parent directory to path to import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backfill import compact, parse_saison, player_job, poule_jobs, read_partition, run_jobs, season_of
+
+
+def make_client():
+    client = Mock()
+    client.request_count = 0
+
+    def count(response):
+        def call(*args):
+            client.request_count += 1
+            return response
+        return call
+
+    client.historique_classement.side_effect = count({'liste': {'histo': [
+        {'saison': 'Saison 2023 / 2024', 'phase': '1', 'point': '1200'},
+        {'saison': 'Saison 2024 / 2025', 'phase': '2', 'point': '1250'},
+    ]}})
+    client.parties_joueur.side_effect = count({'liste': {'partie': [
+        {'date': '15/06/2024', 'advnompre': 'A', 'vd': 'V'},
+        {'date': '20/09/2024', 'advnompre': 'B', 'vd': 'D'},
+    ]}})
+    client.rencontre_equipes.side_effect = count({'liste': {'tour': {'equa': 'USFTT 1', 'equb': 'X', 'scorea': '10', 'scoreb': '4'}}})
+    return client
+
+
+class TestSeasons:
+    """Test cases for season_of and parse_saison functions."""
+
+    def test_season_of(self):
+        """Test that seasons start on July 1st."""
+        assert season_of(date(2025, 6, 30)) == '2024-2025'
+        assert season_of(date(2025, 7, 1)) == '2025-2026'
+        assert season_of('01/12/2025') == '2025-2026'
+
+    def test_parse_saison(self):
+        """Test historique_classement season labels."""
+        assert parse_saison('Saison 2019 / 2020') == '2019-2020'
+        assert parse_saison('') is None
+
+
+class TestBackfill:
+    """Test cases for run_jobs and compact functions."""
+
+    def test_partitions_by_season(self, tmp_path):
+        """Test that rows end up in their season's partition."""
+        history_dir = str(tmp_path)
+        seasons = {'2024-2025': [{'libequipe': 'USFTT 1 - Phase 1', 'liendivision': 'cx_poule=1&D1=10'},
+                                 {'libequipe': 'USFTT 2 - Phase 1', 'liendivision': 'cx_poule=1&D1=10'}]}
+        client = make_client()
+
+        jobs = [player_job('123')] + poule_jobs(seasons)
+        assert run_jobs(client, jobs, history_dir, max_workers=2) == 0
+        # One request per poule, even with two club teams in it
+        assert client.rencontre_equipes.call_count == 1
+
+        assert compact(history_dir) == [('2023-2024', 'classements'), ('2023-2024', 'parties'),
+                                        ('2024-2025', 'classements'), ('2024-2025', 'equipes'),
+                                        ('2024-2025', 'parties'), ('2024-2025', 'rencontres')]
+        parties = read_partition('2024-2025', 'parties', history_dir)
+        assert [(p['licence'], p['advnompre']) for p in parties] == [('123', 'B')]
+        assert len(read_partition('2024-2025', 'equipes', history_dir)) == 2
+
+    def test_restartable(self, tmp_path):
+        """Test that failed or over-budget jobs are the only ones run again."""
+        history_dir = str(tmp_path)
+        client = make_client()
+        jobs = [player_job(str(licence)) for licence in range(10)]
+
+        # Each player job makes 2 requests: the budget stops new jobs after 3
+        assert run_jobs(client, jobs, history_dir, max_workers=1, max_requests=6) == 7
+
+        client = make_client()
+        assert run_jobs(client, jobs, history_dir, max_workers=4) == 0
+        assert client.request_count == 14
+
+    def test_compact_is_deterministic(self, tmp_path):
+        """Test that compacting twice gives identical files."""
+        history_dir = str(tmp_path)
+        run_jobs(make_client(), [player_job('1'), player_job('2')], history_dir)
+        filename = os.path.join(history_dir, 'saison=2024-2025', 'parties.csv.gz')
+
+        compact(history_dir)
+        with open(filename, 'rb') as f:
+            first = f.read()
+        compact(history_dir)
+        with open(filename, 'rb') as f:
+            assert f.read() == first
+
+    def test_current_season_refreshed(self, tmp_path):
+        """Test that a later run refreshes the current season and leaves closed seasons alone."""
+        history_dir = str(tmp_path)
+        seasons = {'2024-2025': [{'libequipe': 'USFTT 1', 'liendivision': 'cx_poule=1&D1=10'}],
+                   '2025-2026': [{'libequipe': 'USFTT 1', 'liendivision': 'cx_poule=2&D1=20'}]}
+        for day, score in ((date(2025, 10, 1), '10'), (date(2025, 10, 2), '12')):
+            client = make_client()
+            client.rencontre_equipes.side_effect = lambda poule: {'liste': {'tour': {'equa': 'USFTT 1', 'scorea': score}}}
+            jobs = [player_job('123', day)] + poule_jobs(seasons, day)
+            assert run_jobs(client, jobs, history_dir) == 0
+            compact(history_dir)
+
+        # Second run: the current season's poule and the player again, not the closed poule
+        assert [call.args for call in client.rencontre_equipes.call_args_list] == [('2',)]
+        assert client.historique_classement.call_count == 1
+        assert [r['scorea'] for r in read_partition('2025-2026', 'rencontres', history_dir)] == ['12']
+        assert [r['scorea'] for r in read_partition('2024-2025', 'rencontres', history_dir)] == ['10']
+        assert len(read_partition('2024-2025', 'parties', history_dir)) == 1
+
+    def test_season_rollover(self, tmp_path):
+        """Test that a season closing replaces its last dated poule part (no duplicate rows)."""
+        history_dir = str(tmp_path)
+        seasons = {'2025-2026': [{'libequipe': 'USFTT 1', 'liendivision': 'cx_poule=2&D1=20'}]}
+        for day in (date(2026, 6, 30), date(2026, 7, 1)):
+            assert run_jobs(make_client(), poule_jobs(seasons, day), history_dir) == 0
+
+        assert os.listdir(os.path.join(history_dir, 'parts')) == ['poule_2025-2026_2.json.gz']
+        compact(history_dir)
+        assert len(read_partition('2025-2026', 'rencontres', history_dir)) == 1
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import pytest
+import sys
+import os
+import time
+import xml.etree.ElementTree as ET
+from unittest.mock import patch
+
+# Add parent directory to path to import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fftt import FFTTApiClient, RateLimiter, as_list
+
+
+class TestAsList:
+    """Test cases for as_list function."""
+
+    def test_values(self):
+        """Test normalisation of repeated XML nodes."""
+        assert as_list([{'a': 1}]) == [{'a': 1}]
+        assert as_list({'a': 1}) == [{'a': 1}]
+        assert as_list('\n') == []
+        assert as_list(None) == []
+
+
+class TestClientCache:
+    """Test cases for the client response cache."""
+
+    def test_same_request_fetched_once(self):
+        """Test that identical requests hit the API only once, with independent copies."""
+        client = FFTTApiClient('A001', 'secret', cache=True)
+        with patch.object(client, '_get', return_value=ET.fromstring('<liste><club>1</club></liste>')) as mock_get:
+            first = client.club_detail('08940073')
+            first['liste']['club'] = 'modified'
+            second = client.club_detail('08940073')
+            client.club_detail('08940074')
+
+        assert second == {'liste': {'club': '1'}}
+        assert mock_get.call_count == 2
+
+    def test_errors_are_not_cached(self):
+        """Test that a failed request is retried."""
+        client = FFTTApiClient('A001', 'secret', cache=True)
+        with patch.object(client, '_get', side_effect=[Exception("API Error"), ET.fromstring('<liste/>')]):
+            with pytest.raises(Exception):
+                client.club_detail('08940073')
+            assert client.club_detail('08940073') == {'liste': None}
+
+    def test_no_cache_by_default(self):
+        """Test that the client does not cache unless asked."""
+        client = FFTTApiClient('A001', 'secret')
+        with patch.object(client, '_get', return_value=ET.fromstring('<liste/>')) as mock_get:
+            client.club_detail('08940073')
+            client.club_detail('08940073')
+
+        assert mock_get.call_count == 2
+
+
+class TestRateLimiter:
+    """Test cases for RateLimiter."""
+
+    def test_spacing(self):
+        """Test that calls are spaced by the configured interval."""
+        limiter = RateLimiter(50)
+        start = time.monotonic()
+        for _ in range(6):
+            limiter.wait()
+        assert time.monotonic() - start >= 5 / 50 * 0.9
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+import pytest
+import sys
+import os
+from unittest.mock import Mock
+
+# Add parent directory to path to import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from licence_index import crawl_department, save_department, build_index, LicenceIndex, INDEX_FILE
+
+
+def make_licence(licence, nom, prenom='Jean', numclub='08940073', nomclub='FONTENAY USTT', pointm='1500.5'):
+    return {'licence': licence, 'nom': nom, 'prenom': prenom, 'numclub': numclub, 'nomclub': nomclub,
+            'sexe': 'M', 'cat': 'V65', 'point': '1500', 'pointm': pointm}
+
+
+@pytest.fixture
+def index_dir(tmp_path):
+    save_department([make_licence('94279', 'AUBERTIN'), make_licence('4512885', 'BERRUET', 'Émeric')], '94', str(tmp_path))
+    save_department([make_licence('138959', 'BAUDINAUD', 'Julie', '08750001', 'PARIS TT', '')], '75', str(tmp_path))
+    build_index(str(tmp_path))
+    return tmp_path
+
+
+class TestLicenceIndex:
+    """Test cases for the memory-mapped licence index."""
+
+    def test_lookup(self, index_dir):
+        """Test lookup of licences across departments."""
+        index = LicenceIndex(str(index_dir / INDEX_FILE))
+
+        assert len(index) == 3
+        record = index.get('4512885')
+        assert record['nom'] == 'BERRUET'
+        assert record['prenom'] == 'Émeric'
+        assert record['nomclub'] == 'FONTENAY USTT'
+        assert record['numclub'] == '08940073'
+        assert record['pointm'] == 1500.5
+        assert index.get(138959)['pointm'] is None
+
+    def test_unknown_licence(self, index_dir):
+        """Test unknown or invalid licence numbers."""
+        index = LicenceIndex(str(index_dir / INDEX_FILE))
+
+        assert index.get('1') is None
+        assert index.get('99999999') is None
+        assert 'abc' not in index
+        assert '94279' in index
+
+    def test_incremental_rebuild(self, index_dir):
+        """Test that re-crawling one department keeps the others."""
+        save_department([make_licence('94279', 'AUBERTIN', pointm='1600')], '94', str(index_dir))
+        build_index(str(index_dir))
+        index = LicenceIndex(str(index_dir / INDEX_FILE))
+
+        assert len(index) == 2
+        assert index.get('94279')['pointm'] == 1600
+        assert index.get('138959')['nom'] == 'BAUDINAUD'
+
+
+class TestCrawlDepartment:
+    """Test cases for crawl_department function."""
+
+    def test_crawl(self):
+        """Test that licences of every club are collected, failing clubs skipped."""
+        mock_client = Mock()
+        mock_client.club_dep.return_value = {'liste': {'club': [{'numero': '1'}, {'numero': '2'}, {'numero': '3'}]}}
+        mock_client.licences_club.side_effect = [
+            {'liste': {'licence': make_licence('1', 'A')}},
+            Exception("API Error"),
+            {'liste': '\n'},
+        ]
+
+        licences = crawl_department(mock_client, '94', max_workers=1)
+
+        assert [lic['nom'] for lic in licences] == ['A']
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path to import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from licence_index import save_department, build_index, LicenceIndex, INDEX_FILE
+from name_index import fold, trigrams, build_name_index, NameIndex
+
+
+class TestFold:
+    """Test cases for fold function."""
+
+    def test_accents_and_case(self):
+        """Test accent folding and lowercasing."""
+        assert fold("Émeric BÉRRUET") == "emeric berruet"
+
+    def test_punctuation(self):
+        """Test that punctuation and extra spaces are removed."""
+        assert fold("  D'ALÈS-Jean ") == "d ales jean"
+
+    def test_trigrams(self):
+        """Test padded trigrams of each word."""
+        assert trigrams("ab cd") == {" ab", "ab ", " cd", "cd "}
+
+
+@pytest.fixture
+def name_index(tmp_path):
+    names = [('94279', 'AUBERTIN', 'Jean'), ('4512885', 'BERRUET', 'Emeric'), ('138959', 'BAUDINAUD', 'Julie'),
+             ('1000001', 'DUPONT', 'Jean-Pierre'), ('1000002', 'DUPOND', 'Marie'), ('1000003', 'AUBERT', 'Hélène')]
+    save_department([{'licence': lic, 'nom': nom, 'prenom': prenom, 'numclub': '08940073', 'nomclub': 'FONTENAY',
+                      'sexe': 'M', 'cat': 'S', 'point': '1000', 'pointm': '1000'} for lic, nom, prenom in names],
+                    '94', str(tmp_path))
+    build_index(str(tmp_path))
+    build_name_index(LicenceIndex(str(tmp_path / INDEX_FILE)), str(tmp_path / 'names'))
+    return NameIndex(str(tmp_path / 'names'), str(tmp_path / INDEX_FILE))
+
+
+class TestNameIndex:
+    """Test cases for NameIndex search."""
+
+    def test_exact_name(self, name_index):
+        """Test that the exact name ranks first."""
+        results = name_index.search("berruet emeric")
+        assert results[0]['licence'] == '4512885'
+
+    def test_accents_and_word_order(self, name_index):
+        """Test accent folding and first name/last name order."""
+        results = name_index.search("Helene Aubert")
+        assert results[0]['licence'] == '1000003'
+
+    def test_typo(self, name_index):
+        """Test typo tolerance."""
+        results = name_index.search("baudinot julie")
+        assert results[0]['licence'] == '138959'
+
+    def test_prefix(self, name_index):
+        """Test that a prefix query favours names starting with it."""
+        results = name_index.search("dupo", limit=2)
+        assert {r['licence'] for r in results} == {'1000001', '1000002'}
+
+    def test_no_match(self, name_index):
+        """Test queries without any common trigram."""
+        assert name_index.search("zzz") == []
+        assert name_index.search("") == []
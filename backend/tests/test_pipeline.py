@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+import pytest
+import sys
+import os
+import threading
+
+# Add parent directory to path to import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pipeline import Stage, Pipeline
+
+
+class TestPipelineGraph:
+    """Test cases for the stage graph validation."""
+
+    def test_unknown_input(self):
+        """Test that a stage needing an artifact nobody produces is rejected."""
+        with pytest.raises(ValueError, match="unknown artifacts"):
+            Pipeline([Stage('a', lambda x: 1, inputs=['x'], outputs=['a'])])
+
+    def test_duplicate_output(self):
+        """Test that an artifact can only have one producer."""
+        with pytest.raises(ValueError, match="produced by both"):
+            Pipeline([Stage('a', lambda: 1, outputs=['x']), Stage('b', lambda: 2, outputs=['x'])])
+
+    def test_cycle(self):
+        """Test that cycles are rejected."""
+        with pytest.raises(ValueError, match="Cycle"):
+            Pipeline([Stage('a', lambda y: 1, inputs=['y'], outputs=['x']),
+                      Stage('b', lambda x: 2, inputs=['x'], outputs=['y'])])
+
+
+class TestPipelineRun:
+    """Test cases for Pipeline.run."""
+
+    def test_dependencies_and_values(self, tmp_path):
+        """Test that outputs flow to the dependent stages."""
+        pipeline = Pipeline([
+            Stage('sum', lambda a, b: a + b, inputs=['a', 'b'], outputs=['sum']),
+            Stage('a', lambda: 1, outputs=['a'], always=True),
+            Stage('b', lambda: 2, outputs=['b'], always=True),
+            Stage('both', lambda: {'c': 3, 'd': 4}, outputs=['c', 'd'], always=True),
+        ], state_dir=str(tmp_path))
+
+        statuses = pipeline.run()
+
+        assert statuses == {'sum': 'ran', 'a': 'ran', 'b': 'ran', 'both': 'ran'}
+        assert pipeline._load_artifact('sum') == 3
+        assert pipeline._load_artifact('d') == 4
+
+    def test_independent_branches_run_concurrently(self, tmp_path):
+        """Test that two independent stages run at the same time."""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def branch():
+            barrier.wait()
+            return True
+
+        pipeline = Pipeline([Stage('a', branch, outputs=['a']), Stage('b', branch, outputs=['b'])],
+                            state_dir=str(tmp_path))
+
+        assert pipeline.run() == {'a': 'ran', 'b': 'ran'}
+
+    def test_unchanged_inputs_are_skipped(self, tmp_path):
+        """Test that a stage re-runs only when its inputs changed."""
+        source = {'value': 1}
+        calls = []
+
+        def derived(x):
+            calls.append(x)
+            return x * 10
+
+        def make_pipeline():
+            return Pipeline([
+                Stage('source', lambda: source['value'], outputs=['x'], always=True),
+                Stage('derived', derived, inputs=['x'], outputs=['y']),
+                Stage('final', lambda y: y + 1, inputs=['y'], outputs=['z']),
+            ], state_dir=str(tmp_path))
+
+        make_pipeline().run()
+        statuses = make_pipeline().run()
+        assert statuses == {'source': 'ran', 'derived': 'skipped', 'final': 'skipped'}
+        assert calls == [1]
+
+        source['value'] = 2
+        pipeline = make_pipeline()
+        assert pipeline.run()['derived'] == 'ran'
+        assert pipeline._load_artifact('z') == 21
+
+        assert make_pipeline().run(force=True)['final'] == 'ran'
+
+    def test_new_period_runs_again(self, tmp_path):
+        """Test that a stage depending on the date runs again in a new period."""
+        period = {'value': '2025-11'}
+
+        def make_pipeline():
+            return Pipeline([
+                Stage('source', lambda: 1, outputs=['x'], always=True),
+                Stage('monthly', lambda x: period['value'], inputs=['x'], outputs=['y'],
+                      period=lambda: period['value']),
+            ], state_dir=str(tmp_path))
+
+        make_pipeline().run()
+        assert make_pipeline().run()['monthly'] == 'skipped'
+        period['value'] = '2025-12'
+        pipeline = make_pipeline()
+        assert pipeline.run()['monthly'] == 'ran'
+        assert pipeline._load_artifact('y') == '2025-12'
+
+    def test_failure_blocks_dependents_only(self, tmp_path):
+        """Test that a failing stage blocks its dependents but not other branches."""
+        def boom():
+            raise RuntimeError("API Error")
+
+        pipeline = Pipeline([
+            Stage('bad', boom, outputs=['x']),
+            Stage('after_bad', lambda x: x, inputs=['x'], outputs=['y']),
+            Stage('good', lambda: 1, outputs=['z']),
+        ], state_dir=str(tmp_path))
+
+        assert pipeline.run() == {'bad': 'failed', 'after_bad': 'blocked', 'good': 'ran'}
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path to import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from poule_simulation import build_poule, match_probabilities, simulate_poules, simulation_inputs
+
+
+def make_tour(equa, equb, scorea=None, scoreb=None):
+    return {'equa': equa, 'equb': equb, 'scorea': scorea, 'scoreb': scoreb}
+
+
+class TestBuildPoule:
+    """Test cases for build_poule function."""
+
+    def test_played_and_remaining_fixtures(self):
+        """Test that empty scores are kept as remaining fixtures."""
+        tours = [
+            make_tour('A', 'B', '10', '4'),
+            make_tour('C', 'D', '7', '7'),
+            make_tour('A', 'C'),
+            make_tour('B', 'D'),
+        ]
+        poule = build_poule('123', tours)
+
+        assert poule['teams'] == ['A', 'B', 'C', 'D']
+        assert list(poule['points']) == [3, 1, 2, 2]
+        assert list(poule['home']) == [0, 1]
+        assert list(poule['away']) == [2, 3]
+
+    def test_standings_points(self):
+        """Test that given standings take precedence (penalties from the official ranking)."""
+        tours = [make_tour('A', 'B', '10', '4')]
+        standings = {'B': {'points': '0'}, 'A': {'points': '3'}}
+        poule = build_poule('123', tours, standings)
+
+        assert poule['teams'] == ['A', 'B']
+        assert list(poule['points']) == [3, 0]
+
+    def test_forfeit_points(self):
+        """Test that forfeits give no point to the forfeiting team."""
+        poule = build_poule('123', [make_tour('A', 'B', 'F', '0'), make_tour('A', 'B')])
+
+        assert list(poule['points']) == [0, 3]
+        assert len(poule['home']) == 1
+
+    def test_division_movements(self):
+        """Test that promotions and relegations depend on the division."""
+        tours = [make_tour('A', 'B')]
+        assert build_poule('1', tours, division='N1')['nb_descentes'] == 3
+        assert build_poule('1', tours, division='D4')['nb_descentes'] == 0
+        assert build_poule('1', tours)['nb_montees'] == 1
+
+
+    def test_simulation_inputs(self):
+        """Test that poules are built once, from the resolved standings."""
+        teams = [{'liendivision': 'cx_poule=1&D1=10', 'libdivision': 'Departementale 1'},
+                 {'liendivision': 'cx_poule=1&D1=10', 'libdivision': 'Departementale 1'}]
+        poules = {'1': [make_tour('A', 'B', '10', '4'), make_tour('A', 'B')]}
+        standings = {'1': {'A': {'points': '2'}, 'B': {'points': '1'}}}
+        inputs = simulation_inputs(teams, poules, standings)
+
+        assert len(inputs) == 1
+        assert list(inputs[0]['points']) == [2, 1]
+
+
+class TestMatchProbabilities:
+    """Test cases for match_probabilities function."""
+
+    def test_equal_strengths(self):
+        """Test that equal teams have symmetric win chances."""
+        p_win, p_draw = match_probabilities(0.5, 0.5)
+        assert p_win == pytest.approx((1 - p_draw) / 2)
+
+    def test_stronger_home_team(self):
+        """Test that the stronger team is favourite and draws are rarer."""
+        p_win, p_draw = match_probabilities(0.7, 0.4)
+        _, p_draw_equal = match_probabilities(0.5, 0.5)
+        assert p_win > 0.8
+        assert p_draw < p_draw_equal
+
+
+class TestSimulatePoules:
+    """Test cases for simulate_poules function."""
+
+    def test_finished_poule_is_deterministic(self):
+        """Test a poule without remaining fixtures."""
+        tours = [make_tour('A', 'B', '10', '4'), make_tour('C', 'A', '2', '12'), make_tour('B', 'C', '8', '6')]
+        results = simulate_poules([build_poule('1', tours)], n_simulations=1000, seed=0)
+
+        by_team = {r['equipe']: r for r in results}
+        assert by_team['A']['p_montee'] == 1.0
+        assert by_team['C']['p_descente'] == 1.0
+        assert by_team['B']['rang_moyen'] == 2.0
+
+    def test_probabilities_sum_to_one(self):
+        """Test rank probabilities across several padded poules."""
+        poule_1 = build_poule('1', [make_tour('A', 'B'), make_tour('C', 'D'), make_tour('A', 'C', '9', '5')])
+        poule_2 = build_poule('2', [make_tour('E', 'F'), make_tour('F', 'G')])
+        results = simulate_poules([poule_1, poule_2], n_simulations=5000, seed=1, batch_size=1200)
+
+        for poule_id, nb_teams in (('1', 4), ('2', 3)):
+            rows = [r for r in results if r['poule'] == poule_id]
+            assert len(rows) == nb_teams
+            for r in rows:
+                assert len(r['p_rangs']) == nb_teams
+                assert r['p_rangs'].sum() == pytest.approx(1.0)
+            # Each rank is held by exactly one team in every simulation
+            assert sum(r['p_rangs'] for r in rows) == pytest.approx([1.0] * nb_teams)
+
+    def test_movements_per_poule(self):
+        """Test that each poule uses its own promotion and relegation counts."""
+        tours = [make_tour('A', 'B', '10', '4'), make_tour('C', 'A', '2', '12'), make_tour('B', 'C', '8', '6')]
+        results = simulate_poules([build_poule('1', tours, division='D1'), build_poule('2', tours, division='D4')],
+                                  n_simulations=100, seed=0)
+
+        d1 = {r['equipe']: r for r in results if r['poule'] == '1'}
+        d4 = {r['equipe']: r for r in results if r['poule'] == '2'}
+        # Small poule: relegation only applies after the promotion places
+        assert d1['B']['p_montee'] == 1.0 and d1['B']['p_descente'] == 0.0
+        assert d1['C']['p_montee'] == 0.0 and d1['C']['p_descente'] == 1.0
+        assert d4['B']['p_montee'] == 1.0 and d4['C']['p_descente'] == 0.0
+
+    def test_empty_input(self):
+        """Test that no poule gives no result."""
+        assert simulate_poules([]) == []
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+from datetime import date, datetime
+
+# Add parent directory to path to import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from refresh_planner import load_state, needs_refresh, plan_refresh, record_full_sweep
+
+NOW = datetime(2025, 10, 15, 20, 0)
+STATE = {'last_full_sweep': '2025-10-13T20:00:00'}
+
+
+def make_tour(equa, equb, date, scorea=None, scoreb=None):
+    return {'equa': equa, 'equb': equb, 'datereelle': date, 'scorea': scorea, 'scoreb': scoreb}
+
+
+def make_team(name, poule, division='Departementale 1 Poule 1'):
+    return {'libequipe': f"{name} - Phase 1", 'libdivision': division,
+            'liendivision': f"cx_poule={poule}&D1={poule}00&organisme_pere=94"}
+
+
+TEAMS = [make_team('USFTT 1', '1'), make_team('USFTT 2', '2', 'Departementale 2 Poule 2')]
+POULES = {
+    '1': [make_tour('USFTT 1', 'X', '13/10/2025', '10', '4'), make_tour('Y', 'USFTT 1', '27/10/2025')],
+    '2': [make_tour('USFTT 2', 'Z', '29/09/2025', '9', '5'), make_tour('W', 'USFTT 2', '20/10/2025')],
+}
+COMPETITORS = [
+    {'licence': '1', 'nom': 'DUPONT', 'prenom': 'Jean'},
+    {'licence': '2', 'nom': 'MARTIN', 'prenom': 'Élodie'},
+    {'licence': '3', 'nom': 'DURAND', 'prenom': 'Paul'},
+]
+FEUILLES = [
+    {'team_id': '1G', 'joueur_a': 'DUPONT Jean', 'joueur_b': 'ADVERSAIRE Luc'},
+    {'team_id': '1G', 'joueur_a': 'MARTIN Elodie', 'joueur_b': 'AUTRE Marc'},
+    {'team_id': '2G', 'joueur_a': 'DURAND Paul', 'joueur_b': 'AUTRE Marc'},
+]
+
+
+class TestNeedsRefresh:
+    """Test cases for needs_refresh function."""
+
+    def test_recent_match(self):
+        """Test that a match played in the last days is refreshed."""
+        assert needs_refresh(make_tour('A', 'B', '13/10/2025', '10', '4'), date(2025, 10, 15))
+
+    def test_old_and_future_matches(self):
+        """Test that old finished matches and future matches are idle."""
+        today = date(2025, 10, 15)
+        assert not needs_refresh(make_tour('A', 'B', '29/09/2025', '10', '4'), today)
+        assert not needs_refresh(make_tour('A', 'B', '20/10/2025'), today)
+
+    def test_missing_result(self):
+        """Test that a past match without result is refreshed until it is entered."""
+        today = date(2025, 10, 15)
+        assert needs_refresh(make_tour('A', 'B', '06/10/2025'), today)
+        assert not needs_refresh(make_tour('A', 'B', '06/09/2025'), today)
+
+    def test_planned_date(self):
+        """Test that the planned date is used when the actual date is unknown."""
+        tour = {'equa': 'A', 'equb': 'B', 'datereelle': '', 'dateprevue': '14/10/2025'}
+        assert needs_refresh(tour, date(2025, 10, 15))
+
+
+class TestPlanRefresh:
+    """Test cases for plan_refresh function."""
+
+    def test_only_active_poules_and_players(self):
+        """Test that only the poule and players of the team that just played are planned."""
+        plan = plan_refresh(TEAMS, POULES, COMPETITORS, FEUILLES, STATE, now=NOW)
+
+        assert not plan.full_sweep
+        assert plan.poules == {'1'}
+        assert plan.players == {'1', '2'}
+
+    def test_mid_week_nothing_to_do(self):
+        """Test that a run between two match days plans no request."""
+        plan = plan_refresh(TEAMS, POULES, COMPETITORS, FEUILLES, STATE, now=datetime(2025, 10, 18, 20, 0))
+
+        assert not plan.full_sweep
+        assert plan.poules == set()
+        assert plan.players == set()
+
+    def test_unknown_roster(self):
+        """Test that every player is refreshed when a team has no known sheet."""
+        plan = plan_refresh(TEAMS, POULES, COMPETITORS, [], STATE, now=NOW)
+
+        assert plan.players == {'1', '2', '3'}
+
+    def test_full_sweep(self):
+        """Test the fallback full sweeps."""
+        assert plan_refresh(None, POULES, COMPETITORS, FEUILLES, STATE, now=NOW).full_sweep
+        assert plan_refresh(TEAMS, POULES, COMPETITORS, FEUILLES, {}, now=NOW).full_sweep
+        assert plan_refresh(TEAMS, POULES, COMPETITORS, FEUILLES, STATE, now=datetime(2025, 10, 20, 21, 0)).full_sweep
+        # A team moved to a poule never fetched
+        teams = TEAMS + [make_team('USFTT 3', '3')]
+        assert plan_refresh(teams, POULES, COMPETITORS, FEUILLES, STATE, now=NOW).full_sweep
+
+
+class TestPlannerState:
+    """Test cases for the planner state file."""
+
+    def test_record_full_sweep(self, tmp_path):
+        """Test that the last full sweep is persisted."""
+        state_file = str(tmp_path / 'cache' / 'planner.json')
+        assert load_state(state_file) == {}
+
+        record_full_sweep(NOW, state_file)
+
+        assert load_state(state_file) == {'last_full_sweep': '2025-10-15T20:00:00'}
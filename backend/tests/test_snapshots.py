@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+import pytest
+import sys
+import os
+import weakref
+from datetime import date, timedelta
+
+# Add parent directory to path to import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from snapshots import MAX_DELTA_CHAIN, SnapshotStore, apply_delta, line_delta
+
+HEADER = 'licence,nom,pointm\n'
+
+
+def write_csv(data_dir, rows, filename='competitors.csv'):
+    os.makedirs(data_dir, exist_ok=True)
+    with open(os.path.join(data_dir, filename), 'w', encoding='utf-8', newline='') as f:
+        f.write(HEADER + ''.join(f"{licence},{nom},{points}\n" for licence, nom, points in rows))
+
+
+def make_rows(n, points=500):
+    return [(str(1000 + i), f"JOUEUR {i}", points + i) for i in range(n)]
+
+
+class TestLineDelta:
+    """Test cases for line_delta and apply_delta functions."""
+
+    def test_round_trip(self):
+        """Test that a delta turns the old lines into the new ones."""
+        old = [f"{i},x\n" for i in range(1000)]
+        new = old[:10] + ['inserted\n'] + old[10:500] + ['changed\n'] + old[501:990]
+        ops = line_delta(old, new)
+
+        assert apply_delta(old, ops) == new
+        assert sum(len(lines) for _, _, lines in ops) == 2
+
+    def test_no_change(self):
+        """Test that identical versions give an empty delta."""
+        lines = ['a\n', 'b\n']
+        assert line_delta(lines, lines) == []
+
+
+class TestSnapshotStore:
+    """Test cases for SnapshotStore."""
+
+    def test_restore_and_point_in_time(self, tmp_path):
+        """Test exact reconstruction, and that a date reads the latest earlier snapshot."""
+        data_dir, store = str(tmp_path / 'data'), SnapshotStore(str(tmp_path / 'snapshots'))
+        write_csv(data_dir, make_rows(100))
+        store.snapshot(data_dir, date(2025, 11, 30))
+        with open(os.path.join(data_dir, 'competitors.csv'), encoding='utf-8') as f:
+            original = f.read()
+        write_csv(data_dir, make_rows(100, points=600))
+        store.snapshot(data_dir, date(2025, 12, 2))
+
+        assert store.restore('2025-12-01', 'competitors.csv') == original
+        assert store.rows(date(2025, 12, 5), 'competitors.csv')[0]['pointm'] == '600'
+        with pytest.raises(KeyError):
+            store.restore('2025-11-01', 'competitors.csv')
+
+    def test_deduplication(self, tmp_path):
+        """Test that unchanged data is stored once."""
+        data_dir, store = str(tmp_path / 'data'), SnapshotStore(str(tmp_path / 'snapshots'))
+        write_csv(data_dir, make_rows(2000))
+        first = store.snapshot(data_dir, date(2025, 12, 1))
+        assert first['written'] > 0
+        assert store.snapshot(data_dir, date(2025, 12, 2))['written'] == 0
+
+        rows = make_rows(2000)
+        rows[1000] = ('2000', 'JOUEUR 1000', 9999)
+        write_csv(data_dir, rows)
+        assert 0 < store.snapshot(data_dir, date(2025, 12, 3))['written'] < first['written'] / 10
+        assert store.dates() == ['2025-12-01', '2025-12-02', '2025-12-03']
+
+    def test_storage_ratio(self, tmp_path):
+        """Test that a season of daily snapshots takes about one copy plus the changed rows."""
+        data_dir, store = str(tmp_path / 'data'), SnapshotStore(str(tmp_path / 'snapshots'))
+        rows = make_rows(3000)
+        filename = os.path.join(data_dir, 'competitors.csv')
+        changed_bytes = 0
+        for day in range(150):
+            for i in range(day * 7, day * 7 + 20):
+                licence, nom, points = rows[i * 37 % 3000]
+                rows[i * 37 % 3000] = (licence, nom, points + 1)
+                changed_bytes += len(f"{licence},{nom},{points + 1}\n")
+            write_csv(data_dir, rows)
+            store.snapshot(data_dir, date(2025, 9, 1) + timedelta(days=day))
+
+        stored = sum(os.path.getsize(os.path.join(directory, name))
+                     for directory, _, names in os.walk(str(tmp_path / 'snapshots')) for name in names)
+        assert stored < os.path.getsize(filename) + changed_bytes
+        # Any date is rebuilt from a bounded chain of deltas
+        assert store.restore('2026-01-27', 'competitors.csv').count('\n') == 3001
+        depth = store.read_object(store.manifest('2026-01-27')['files']['competitors.csv']['object']).get('depth', 0)
+        assert depth <= MAX_DELTA_CHAIN
+
+    def test_cache_per_store(self, tmp_path):
+        """Test that decoded objects are cached per store and released with it."""
+        data_dir = str(tmp_path / 'data')
+        write_csv(data_dir, make_rows(10))
+        store = SnapshotStore(str(tmp_path / 'a'))
+        store.snapshot(data_dir, date(2025, 12, 1))
+        store.restore('2025-12-01', 'competitors.csv')
+
+        assert store._lines and not SnapshotStore(str(tmp_path / 'b'))._lines
+        reference = weakref.ref(store)
+        del store
+        assert reference() is None
+
+    def test_diff(self, tmp_path):
+        """Test rows added, removed and changed between two dates."""
+        data_dir, store = str(tmp_path / 'data'), SnapshotStore(str(tmp_path / 'snapshots'))
+        rows = make_rows(300)
+        write_csv(data_dir, rows)
+        store.snapshot(data_dir, date(2025, 12, 1))
+        write_csv(data_dir, rows[1:150] + [('1150', 'JOUEUR 150', 1)] + rows[151:] + [('9999', 'NOUVEAU', 500)])
+        store.snapshot(data_dir, date(2025, 12, 8))
+
+        changes = store.diff('2025-12-01', '2025-12-08', 'competitors.csv', key='licence')
+
+        assert [row['licence'] for row in changes['added']] == ['9999']
+        assert [row['licence'] for row in changes['removed']] == ['1000']
+        assert [(old['pointm'], new['pointm']) for old, new in changes['changed']] == [('650', '1')]
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+import pytest
+import sys
+import os
+from unittest.mock import Mock
+
+# Add parent directory to path to import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from usftt_results_sheets import get_renc_id, fetch_sheets, save_sheets_to_csv, sheet_games
+
+
+def make_match(renc_id, scorea='8', scoreb='6'):
+    return {
+        'lien': f'renc_id={renc_id}&is_retour=0&phase=1&res_1={scorea}&res_2={scoreb}',
+        'scorea': scorea,
+        'scoreb': scoreb,
+    }
+
+
+class TestGetRencId:
+    """Test cases for get_renc_id function."""
+
+    def test_extract_renc_id(self):
+        """Test extraction of renc_id from the lien field."""
+        assert get_renc_id('renc_id=1544322&is_retour=0&phase=1') == '1544322'
+
+    def test_missing_lien(self):
+        """Test that a missing lien gives None."""
+        assert get_renc_id(None) is None
+        assert get_renc_id('phase=1') is None
+
+
+class TestFetchSheets:
+    """Test cases for fetch_sheets function."""
+
+    def test_only_played_rencontres_are_fetched(self, tmp_path):
+        """Test that rencontres without scores are skipped."""
+        mock_client = Mock()
+        mock_client.rencontre_detail.return_value = {'liste': {'partie': []}}
+
+        sheets = fetch_sheets(mock_client, [make_match('1'), make_match('2', None, None)], cache_dir=str(tmp_path))
+
+        assert list(sheets) == ['1']
+        assert mock_client.rencontre_detail.call_count == 1
+
+    def test_cached_sheets_are_not_refetched(self, tmp_path):
+        """Test that a finished rencontre is fetched only once."""
+        mock_client = Mock()
+        mock_client.rencontre_detail.return_value = {'liste': {'partie': {'ja': 'A', 'jb': 'B'}}}
+        matches = [make_match('1'), make_match('2')]
+
+        fetch_sheets(mock_client, matches, cache_dir=str(tmp_path))
+        sheets = fetch_sheets(mock_client, matches, cache_dir=str(tmp_path))
+
+        assert mock_client.rencontre_detail.call_count == 2
+        assert sheet_games(sheets['2']) == [{'ja': 'A', 'jb': 'B'}]
+
+    def test_empty_sheet_is_not_cached(self, tmp_path):
+        """Test that a sheet without games (not entered yet) is fetched again."""
+        mock_client = Mock()
+        mock_client.rencontre_detail.return_value = {'liste': {'partie': []}}
+
+        fetch_sheets(mock_client, [make_match('1')], cache_dir=str(tmp_path))
+        fetch_sheets(mock_client, [make_match('1')], cache_dir=str(tmp_path))
+
+        assert mock_client.rencontre_detail.call_count == 2
+        assert not os.listdir(tmp_path)
+
+    def test_failed_fetch_is_not_cached(self, tmp_path):
+        """Test that API errors are retried on the next run."""
+        mock_client = Mock()
+        mock_client.rencontre_detail.side_effect = Exception("API Error")
+
+        assert fetch_sheets(mock_client, [make_match('1')], cache_dir=str(tmp_path)) == {}
+        assert not os.listdir(tmp_path)
+
+
+class TestSaveSheetsToCsv:
+    """Test cases for save_sheets_to_csv function."""
+
+    def test_atomic_write(self, tmp_path, monkeypatch):
+        """Test that the CSV is replaced as a whole (no temporary file left behind)."""
+        monkeypatch.chdir(tmp_path)
+        save_sheets_to_csv([{'team_id': '1G', 'joueur_a': 'A'}], '1')
+
+        assert os.listdir(tmp_path / 'data') == ['feuilles_1.csv']
+        assert (tmp_path / 'data' / 'feuilles_1.csv').read_text(encoding='utf-8').splitlines()[1].startswith('1G,')
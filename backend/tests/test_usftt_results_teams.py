@@ -3,12 +3,16 @@
 import pytest
 import sys
 import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from unittest.mock import Mock, MagicMock
 
 # Add parent directory to path to import the module
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from usftt_results_teams import normalize_division, extract_team_id, get_team_ranking
+from usftt_results_teams import (normalize_division, extract_team_id, get_team_ranking,
+                                 parse_result, compute_standings, resolve_standings)
 
 
 class TestNormalizeDivision:
@@ -314,3 +318,150 @@ class TestGetTeamRanking:
 
         assert result['rang'] == 'N/A'
         assert result['points'] == 'N/A'
+
+
+def make_tour(equa, equb, scorea=None, scoreb=None):
+    return {'equa': equa, 'equb': equb, 'scorea': scorea, 'scoreb': scoreb}
+
+
+class TestParseResult:
+    """Test cases for parse_result function."""
+
+    def test_home_victory(self):
+        """Test a home victory."""
+        assert parse_result('8', '6') == ('V', 'D')
+
+    def test_away_victory(self):
+        """Test an away victory."""
+        assert parse_result('4', '10') == ('D', 'V')
+
+    def test_draw(self):
+        """Test a draw."""
+        assert parse_result('7', '7') == ('N', 'N')
+
+    def test_forfeit(self):
+        """Test forfeits of one or both teams."""
+        assert parse_result('F', '0') == ('F', 'V')
+        assert parse_result('0', 'FF') == ('V', 'F')
+        assert parse_result('F', 'F') == ('F', 'F')
+
+    def test_not_played(self):
+        """Test a rencontre without score."""
+        assert parse_result(None, None) is None
+        assert parse_result('', '') is None
+
+
+class TestComputeStandings:
+    """Test cases for compute_standings function."""
+
+    def test_points_and_counters(self):
+        """Test FFTT points (V=3, N=2, D=1, F=0) and match counters."""
+        tours = [
+            make_tour('A', 'B', '10', '4'),
+            make_tour('C', 'D', '7', '7'),
+            make_tour('A', 'C', 'F', '0'),
+            make_tour('B', 'D'),
+        ]
+        standings = compute_standings(tours)
+
+        assert standings['A'] == {'rang': '2', 'points': '3', 'joues': '2', 'victoires': '1',
+                                  'nuls': '0', 'defaites': '0', 'forfaits': '1'}
+        assert standings['C']['rang'] == '1'
+        assert standings['C']['points'] == '5'
+        assert standings['B']['points'] == '1'
+        assert standings['D']['joues'] == '1'
+
+    def test_head_to_head_tie_break(self):
+        """Test that tied teams are ordered by their direct rencontre."""
+        tours = [
+            make_tour('A', 'B', '6', '8'),
+            make_tour('A', 'C', '14', '0'),
+            make_tour('B', 'D', '5', '9'),
+        ]
+        standings = compute_standings(tours)
+
+        # A and B have 4 points; B won the direct rencontre despite a worse games difference
+        assert standings['B']['rang'] == '1'
+        assert standings['A']['rang'] == '2'
+        assert standings['D']['rang'] == '3'
+        assert standings['C']['rang'] == '4'
+
+    def test_no_result(self):
+        """Test a poule where nothing has been played yet."""
+        standings = compute_standings([make_tour('A', 'B')])
+        assert standings['A']['points'] == '0'
+        assert standings['B']['joues'] == '0'
+
+
+class TestResolveStandings:
+    """Test cases for resolve_standings function."""
+
+    TOURS = [make_tour('A', 'B', '10', '4')]
+    OFFICIAL = {'liste': {'classement': [
+        {'equipe': 'A', 'clt': '1', 'pts': '3', 'joue': '1', 'vic': '1', 'nul': '0', 'def': '0', 'pf': '0'},
+        {'equipe': 'B', 'clt': '2', 'pts': '1', 'joue': '1', 'vic': '0', 'nul': '0', 'def': '1', 'pf': '0'},
+    ]}}
+
+    def test_official_ranking_checked_then_skipped(self, tmp_path):
+        """Test that a matching official ranking is not fetched again before the check period."""
+        mock_client = Mock()
+        mock_client.classement_poule.return_value = self.OFFICIAL
+        now = datetime(2025, 12, 1)
+
+        first = resolve_standings(mock_client, '1', '2', self.TOURS, cache_dir=str(tmp_path), now=now)
+        second = resolve_standings(mock_client, '1', '2', self.TOURS, cache_dir=str(tmp_path),
+                                   now=now + timedelta(days=1))
+
+        assert first == second
+        assert second['A']['rang'] == '1'
+        assert mock_client.classement_poule.call_count == 1
+
+    def test_periodic_check(self, tmp_path):
+        """Test that the official ranking is fetched again after the check period."""
+        mock_client = Mock()
+        mock_client.classement_poule.return_value = self.OFFICIAL
+        now = datetime(2025, 12, 1)
+
+        resolve_standings(mock_client, '1', '2', self.TOURS, cache_dir=str(tmp_path), now=now, check_days=7)
+        resolve_standings(mock_client, '1', '2', self.TOURS, cache_dir=str(tmp_path),
+                          now=now + timedelta(days=8), check_days=7)
+
+        assert mock_client.classement_poule.call_count == 2
+
+    def test_mismatch_uses_official_ranking(self, tmp_path):
+        """Test that a penalty in the official ranking wins and is checked on every run."""
+        penalised = json.loads(json.dumps(self.OFFICIAL))
+        penalised['liste']['classement'][0]['pts'] = '2'
+        mock_client = Mock()
+        mock_client.classement_poule.return_value = penalised
+        now = datetime(2025, 12, 1)
+
+        first = resolve_standings(mock_client, '1', '2', self.TOURS, cache_dir=str(tmp_path), now=now)
+        resolve_standings(mock_client, '1', '2', self.TOURS, cache_dir=str(tmp_path), now=now)
+
+        assert first['A']['points'] == '2'
+        assert mock_client.classement_poule.call_count == 2
+
+    def test_api_error_falls_back_to_local(self, tmp_path):
+        """Test that local standings are used when the API fails."""
+        mock_client = Mock()
+        mock_client.classement_poule.side_effect = Exception("API Error")
+
+        standings = resolve_standings(mock_client, '1', '2', self.TOURS, cache_dir=str(tmp_path))
+
+        assert standings['A']['points'] == '3'
+        assert not os.listdir(tmp_path)
+
+    def test_concurrent_resolution(self, tmp_path):
+        """Test that concurrent checks of the same poule leave one complete cache file."""
+        mock_client = Mock()
+        mock_client.classement_poule.return_value = self.OFFICIAL
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(
+                lambda _: resolve_standings(mock_client, '1', '2', self.TOURS, cache_dir=str(tmp_path)), range(32)))
+
+        assert all(standings['A']['rang'] == '1' for standings in results)
+        assert os.listdir(tmp_path) == ['1.json']
+        with open(tmp_path / '1.json', encoding='utf-8') as f:
+            assert json.load(f)['match'] is True
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+import pytest
+import sys
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path to import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from virtual_points import parse_points, points_deltas, matches_frame, compute_virtual_points
+
+TODAY = datetime(2025, 12, 15)
+
+
+class TestParsePoints:
+    """Test cases for parse_points function."""
+
+    def test_points_value(self):
+        """Test that a points value is kept as is."""
+        assert parse_points('1234') == 1234
+
+    def test_classement_value(self):
+        """Test that a classement number gives its lower bound in points."""
+        assert parse_points('12') == 1200
+
+    def test_invalid_value(self):
+        """Test that missing values give NaN."""
+        assert np.isnan(parse_points(None))
+        assert np.isnan(parse_points('NC'))
+
+
+class TestPointsDeltas:
+    """Test cases for the FFTT grid lookup."""
+
+    @pytest.mark.parametrize('own, adv, victoire, expected', [
+        (1500, 1500, True, 6),      # Same points
+        (1500, 1500, False, -5),
+        (1500, 1460, True, 5.5),    # Normal win, gap 40
+        (1460, 1500, False, -4.5),  # Normal loss, gap 40
+        (1400, 1500, True, 10),     # Abnormal win, gap 100
+        (1500, 1400, False, -8),    # Abnormal loss, gap 100
+        (2000, 1400, True, 0),      # Normal win, gap 600
+        (1400, 2000, True, 40),     # Abnormal win, gap 600
+        (1400, 2000, False, 0),
+        (2000, 1400, False, -29),
+    ])
+    def test_grid(self, own, adv, victoire, expected):
+        """Test grid values for each kind of result."""
+        assert points_deltas([own], [adv], [victoire])[0] == expected
+
+    def test_unknown_opponent(self):
+        """Test that an unknown opponent ranking counts for nothing."""
+        assert points_deltas([1500], [np.nan], [True])[0] == 0
+
+
+class TestComputeVirtualPoints:
+    """Test cases for compute_virtual_points function."""
+
+    def test_only_current_month_matches(self):
+        """Test that already processed matches are ignored and coefficients applied."""
+        parties = {
+            '111': [
+                {'date': '02/12/2025', 'advclaof': '1500', 'vd': 'V', 'coefchamp': '1.25'},
+                {'date': '05/12/2025', 'advclaof': '1460', 'vd': 'D', 'coefchamp': '1'},
+                {'date': '20/11/2025', 'advclaof': '1000', 'vd': 'D', 'coefchamp': '1'},
+            ],
+            '222': [],
+        }
+        matches = matches_frame(parties, TODAY)
+        assert len(matches) == 2
+
+        points = pd.Series({'111': '1500', '222': '800'})
+        result = compute_virtual_points(points, matches)
+
+        assert result['111'] == pytest.approx(1500 + 6 * 1.25 - 6)
+        assert result['222'] == 800
+
+    def test_gap_from_official_points(self):
+        """Test that the grid gap uses official points, and gains go to monthly points."""
+        parties = {'111': [{'date': '02/12/2025', 'advclaof': '1500', 'vd': 'V', 'coefchamp': '1'}]}
+        points = pd.Series({'111': '1480'})    # gap 20: 0-24 bracket
+        official = pd.Series({'111': '1440'})  # gap 60: 50-99 bracket, the one used
+        result = compute_virtual_points(points, matches_frame(parties, TODAY), official)
+
+        assert result['111'] == pytest.approx(1480 + 8)
+
+    def test_no_matches(self):
+        """Test that monthly points are returned without matches."""
+        points = pd.Series({'111': '1500'})
+        result = compute_virtual_points(points, matches_frame({}, TODAY))
+        assert result['111'] == 1500
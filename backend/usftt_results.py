@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 
-from fftt import FFTTApiClient
+from fftt import FFTTApiClient, as_list
+from virtual_points import compute_virtual_points, is_unprocessed, matches_frame
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import calendar
 
 import os
@@ -17,14 +19,18 @@ def get_month(nb: int) -> str:
     approx_last_month = first + timedelta(days=nb * 30)
     return f"pts_{approx_last_month.strftime('%y%m')}"
 
-def save_to_csv(data, filename, fieldnames):
-    """Generic function to save data to CSV with merging capability."""
+def save_to_csv(data, filename, fieldnames, overwrite=()):
+    """Generic function to save data to CSV with merging capability.
+
+    Columns listed in `overwrite` are always refreshed with the new values.
+    """
     # Convert new data to DataFrame
     new_df = pd.DataFrame(data)
     
     try:
         # Try to read existing CSV file
         existing_df = pd.read_csv(filename)
+        existing_df = existing_df.drop(columns=[c for c in overwrite if c in existing_df.columns])
         
         # Convert numeric columns to string to ensure consistent handling
         numeric_cols = ['idlicence', 'licence']
@@ -57,8 +63,9 @@ def save_to_csv(data, filename, fieldnames):
     front_cols = ['idlicence', 'licence', 'sexe', 'cat', 'prenom', 'nom']  # columns you want first
     merged_df = merged_df[front_cols + sorted([c for c in merged_df.columns if c not in front_cols])]
     
-    # Save to CSV
-    merged_df.to_csv(filename, index=False)
+    # Save to CSV (write then rename: the API server never reads a partial file)
+    merged_df.to_csv(f"{filename}.tmp", index=False)
+    os.replace(f"{filename}.tmp", filename)
     return len(merged_df)
 
 def save_competitors_to_csv(competitors, club_number):
@@ -72,10 +79,10 @@ def save_competitors_to_csv(competitors, club_number):
     filename = os.path.join('data', f"competitors_{club_number}.csv")
     fieldnames = [
         'idlicence', 'licence', 'sexe', 'cat', 'prenom', 'nom', 'point',
-         'parties', get_month(-1), get_month(-2)
+         'parties', get_month(-1), get_month(-2), 'pts_virtuels'
     ]
 
-    count = save_to_csv(competitors, filename, fieldnames)
+    count = save_to_csv(competitors, filename, fieldnames, overwrite=('pts_virtuels',))
     print(f"📝 {count} competitors saved to {filename}")
 
 def save_licenses_to_csv(licenses, club_number):
@@ -109,6 +116,40 @@ def to_float(value):
     except (TypeError, ValueError):
         return 0.0  # or None, if you prefer
 
+def fetch_licenses(client: FFTTApiClient, club_number: str):
+    """Fetch all licences of the club."""
+    return as_list(client.licences_club(club_number).get('liste').get('licence'))
+
+def fetch_competitors_parties(client: FFTTApiClient, licenses, max_workers=1):
+    """Fetch the matches of every competitor (type T): dict licence -> parties."""
+    licences = [lic['licence'] for lic in licenses if lic.get('type') == 'T']
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(licences, executor.map(lambda licence: fetch_parties(client, licence), licences)))
+
+def build_competitors(licenses, parties_by_licence):
+    """Build competitors rows: matches played, progressions and virtual points."""
+    # Filter licenses to keep only type 'T' (competitive), on copies so licenses stay untouched
+    competitors = [copy.deepcopy(lic) for lic in licenses if lic.get('type') == 'T']
+
+    for competitor in competitors:
+        for k in ('numclub', 'nomclub', 'type', 'certif', 'validation', 'echelon', 'place', 'mutation', 'natio', 'arb', 'ja', 'tech'): competitor.pop(k, None)
+        competitor['parties'] = nb_parties_jouees(parties_by_licence.get(competitor['licence'], []))
+        competitor[get_month(-1)] = competitor.pop("pointm")
+        competitor[get_month(-2)] = competitor.pop("apointm")
+        competitor['prg_m'] = to_float(competitor[get_month(-1)]) - to_float(competitor[get_month(-2)])
+        competitor['prg_p'] = to_float(competitor[get_month(-1)]) - to_float(competitor['point'])
+        competitor['prg_a'] = to_float(competitor[get_month(-1)]) - to_float(competitor['initm'])
+
+    # Virtual points: monthly points + current month matches through the FFTT grid
+    # (gap between official points, like the opponents' advclaof)
+    monthly_points = pd.Series({c['licence']: c[get_month(-1)] for c in competitors})
+    official_points = pd.Series({c['licence']: c.get('point') for c in competitors})
+    virtual_points = compute_virtual_points(monthly_points, matches_frame(parties_by_licence), official_points)
+    for competitor in competitors:
+        competitor['pts_virtuels'] = float(virtual_points[competitor['licence']])
+
+    return competitors
+
 def main():
     """Fetch and display USFTT club details and teams."""
     # Initialize FFTT client
@@ -129,23 +170,14 @@ def main():
     try:
         # Get list joueurs du club
         print("📍 Fetching list joueurs du club...")
-        all_licenses = client.licences_club(club_number).get('liste').get('licence')
+        all_licenses = fetch_licenses(client, club_number)
         save_licenses_to_csv(all_licenses, club_number)
-        
-        # Filter licenses to keep only type 'T' (competitive)
-        competitors = [lic for lic in all_licenses if lic.get('type') == 'T']
-        print(f"\n🏓 {len(competitors)}/{len(all_licenses)} competitors found (type T)")
-        
+
         # Add number of matches played for each license
         print("\n📊 Fetching matches played for each competitor...")
-        for competitor in competitors:
-            for k in ('numclub', 'nomclub', 'type', 'certif', 'validation', 'echelon', 'place', 'mutation', 'natio', 'arb', 'ja', 'tech'): competitor.pop(k, None)
-            competitor['parties'] = nb_parties_jouees(client, competitor['licence'])
-            competitor[get_month(-1)] = competitor.pop("pointm")
-            competitor[get_month(-2)] = competitor.pop("apointm")
-            competitor['prg_m'] = to_float(competitor[get_month(-1)]) - to_float(competitor[get_month(-2)])
-            competitor['prg_p'] = to_float(competitor[get_month(-1)]) - to_float(competitor['point'])
-            competitor['prg_a'] = to_float(competitor[get_month(-1)]) - to_float(competitor['initm'])
+        parties_by_licence = fetch_competitors_parties(client, all_licenses)
+        competitors = build_competitors(all_licenses, parties_by_licence)
+        print(f"\n🏓 {len(competitors)}/{len(all_licenses)} competitors found (type T)")
 
         # Save competitors to CSV
         save_competitors_to_csv(competitors, club_number)
@@ -154,26 +186,16 @@ def main():
         print(f"❌ Error occurred: {e}")
         sys.exit(1)
 
-def nb_parties_jouees(client: FFTTApiClient, licence: str):
+def fetch_parties(client: FFTTApiClient, licence: str):
+    """Fetch all matches of a player from parties_joueur."""
     list_parties_joueur = client.parties_joueur(licence).get('liste')
-    if list_parties_joueur == '\n' or not list_parties_joueur.get('partie'):
-        return 0
-        
-    # Get current month and year
-    current_date = datetime.now()
-    current_month = current_date.month
-    current_year = current_date.year
-        
-    # Filter out matches from current month
-    filtered_matches = [
-        match for match in list_parties_joueur.get('partie')
-        if (
-            (parsed_date := datetime.strptime(match['date'], '%d/%m/%Y')).month != current_month
-            or parsed_date.year != current_year
-        )
-    ]
-    
-    return len(filtered_matches)
+    if list_parties_joueur == '\n' or not list_parties_joueur:
+        return []
+    return as_list(list_parties_joueur.get('partie'))
+
+def nb_parties_jouees(parties):
+    """Count matches already included in the monthly points (current month filtered out)."""
+    return len([match for match in parties if not is_unprocessed(match['date'])])
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
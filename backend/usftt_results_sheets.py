@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+
+from fftt import FFTTApiClient, as_list
+from usftt_results_teams import extract_team_id, fetch_club_teams, fetch_poules, parse_division_link, parse_score
+from concurrent.futures import ThreadPoolExecutor
+import urllib.parse
+
+import os
+import sys
+import csv
+import json
+import argparse
+
+# Nombre maximum de feuilles de match téléchargées en parallèle
+MAX_WORKERS = 8
+
+# Débit partagé par tous les threads du téléchargement
+MAX_REQUESTS_PER_SECOND = 4
+
+CACHE_DIR = os.path.join('data', 'cache', 'feuilles')
+
+FIELDNAMES = ['team_id', 'poule', 'tour', 'date', 'renc_id', 'equipe_a', 'equipe_b',
+              'joueur_a', 'joueur_b', 'score_a', 'score_b', 'detail']
+
+def get_renc_id(lien):
+    """Extract the rencontre ID from the `lien` field of rencontre_equipes."""
+    return dict(urllib.parse.parse_qsl(lien or '')).get('renc_id')
+
+def is_played(match):
+    """A rencontre with both scores set is finished: its sheet will not change anymore."""
+    return parse_score(match.get('scorea')) is not None and parse_score(match.get('scoreb')) is not None
+
+def load_cached_sheet(renc_id, cache_dir=CACHE_DIR):
+    """Return the cached sheet of a rencontre, None if it was never fetched."""
+    try:
+        with open(os.path.join(cache_dir, f"{renc_id}.json"), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def save_cached_sheet(renc_id, sheet, cache_dir=CACHE_DIR):
+    """Cache a sheet atomically (several workers write concurrently)."""
+    os.makedirs(cache_dir, exist_ok=True)
+    filename = os.path.join(cache_dir, f"{renc_id}.json")
+    with open(f"{filename}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(sheet, f, ensure_ascii=False)
+    os.replace(f"{filename}.tmp", filename)
+
+def fetch_sheets(client, matches, max_workers=MAX_WORKERS, cache_dir=CACHE_DIR):
+    """Fetch the sheets of played rencontres, reusing the cache for already fetched ones.
+
+    Returns a dict renc_id -> sheet.
+    """
+    sheets = {}
+    to_fetch = {}
+    for match in matches:
+        renc_id = get_renc_id(match.get('lien'))
+        if not renc_id or not is_played(match) or renc_id in sheets or renc_id in to_fetch:
+            continue
+        cached = load_cached_sheet(renc_id, cache_dir)
+        if cached is not None:
+            sheets[renc_id] = cached
+        else:
+            to_fetch[renc_id] = match['lien']
+
+    print(f"📄 {len(sheets)} sheets from cache, {len(to_fetch)} to fetch")
+
+    def fetch(item):
+        renc_id, lien = item
+        try:
+            sheet = client.rencontre_detail(lien)
+        except Exception as e:
+            print(f"⚠️  Warning: Could not fetch sheet for rencontre {renc_id}: {e}")
+            return renc_id, None
+        # A sheet without games (not entered yet, error payload) is fetched again next time
+        if sheet_games(sheet):
+            save_cached_sheet(renc_id, sheet, cache_dir)
+        return renc_id, sheet
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for renc_id, sheet in executor.map(fetch, to_fetch.items()):
+            if sheet is not None:
+                sheets[renc_id] = sheet
+
+    return sheets
+
+def sheet_games(sheet):
+    """Return the individual games (partie) of a sheet."""
+    liste = sheet.get('liste')
+    if not isinstance(liste, dict):
+        return []
+    return as_list(liste.get('partie'))
+
+def collect_club_matches(teams, poules):
+    """List (team_id, poule, match) for every rencontre of the club's teams."""
+    club_matches = []
+    for team in teams:
+        poule_number, _ = parse_division_link(team.get('liendivision', ''))
+        team_name = team.get('libequipe', 'N/A').split(' - Phase')[0]
+        team_id = extract_team_id(team.get('libequipe', ''), team.get('libdivision', ''))
+        for match in poules.get(poule_number, []):
+            if team_name in (match.get('equa'), match.get('equb')):
+                club_matches.append((team_id, poule_number, match))
+    return club_matches
+
+def build_sheet_rows(club_matches, sheets):
+    """Build the feuilles CSV rows (one per individual game)."""
+    csv_data = []
+    for team_id, poule_number, match in club_matches:
+        renc_id = get_renc_id(match.get('lien'))
+        if renc_id not in sheets:
+            continue
+        for game in sheet_games(sheets[renc_id]):
+            csv_data.append({
+                'team_id': team_id,
+                'poule': poule_number,
+                'tour': match['libelle'].split('tour n°')[1].split(' ')[0],
+                'date': match['datereelle'],
+                'renc_id': renc_id,
+                'equipe_a': match['equa'],
+                'equipe_b': match['equb'],
+                'joueur_a': game.get('ja') or '',
+                'joueur_b': game.get('jb') or '',
+                'score_a': game.get('scorea') or '',
+                'score_b': game.get('scoreb') or '',
+                'detail': game.get('detail') or ''
+            })
+    return csv_data
+
+def save_sheets_to_csv(csv_data, club_number):
+    """Save the individual games to a CSV file."""
+    os.makedirs('data', exist_ok=True)
+    csv_filename = os.path.join('data', f'feuilles_{club_number}.csv')
+    # Write then rename: the API server never reads a partial file
+    with open(f"{csv_filename}.tmp", 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(csv_data)
+    os.replace(f"{csv_filename}.tmp", csv_filename)
+
+    print(f"\n✅ {len(csv_data)} games written to {csv_filename}")
+
+def main():
+    """Fetch the match sheets of every played rencontre of USFTT teams."""
+    parser = argparse.ArgumentParser(description="Feuilles de match des équipes USFTT")
+    parser.add_argument("--rate", type=float, default=MAX_REQUESTS_PER_SECOND, help="Requêtes par seconde")
+    args = parser.parse_args()
+
+    # Initialize FFTT client
+    try:
+        client = FFTTApiClient(
+            app_id=os.environ['FFTT_APP_ID'],
+            password=os.environ['FFTT_PASSWORD'],
+            serie=os.environ.get('FFTT_SERIE'),
+            max_requests_per_second=args.rate
+        )
+    except KeyError:
+        print("❌ Environment variables FFTT_APP_ID and FFTT_PASSWORD are required")
+        sys.exit(1)
+
+    # USFTT club number
+    club_number = "08940073"
+
+    try:
+        print("📍 Fetching équipes du club...")
+        teams = fetch_club_teams(client, club_number)
+        club_matches = collect_club_matches(teams, fetch_poules(client, teams))
+
+        sheets = fetch_sheets(client, [match for _, _, match in club_matches])
+        save_sheets_to_csv(build_sheet_rows(club_matches, sheets), club_number)
+
+    except Exception as e:
+        print(f"❌ Error occurred: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
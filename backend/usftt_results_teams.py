@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 
-from fftt import FFTTApiClient
+from fftt import FFTTApiClient, as_list
 from datetime import datetime, timedelta
 import calendar
 
@@ -9,7 +9,26 @@ import sys
 import csv
 import pandas as pd
 import copy
+import json
 import re
+import threading
+
+# Points attribués par rencontre (règlement FFTT : victoire 3, nul 2, défaite 1, forfait 0)
+MATCH_POINTS = {'V': 3, 'N': 2, 'D': 1, 'F': 0}
+
+# Le classement calculé localement est comparé au classement officiel tous les N jours
+RANKING_CHECK_DAYS = 7
+RANKING_CACHE_DIR = os.path.join('data', 'cache', 'classements')
+
+NO_RANKING = {
+    'rang': 'N/A',
+    'points': 'N/A',
+    'joues': '0',
+    'victoires': '0',
+    'nuls': '0',
+    'defaites': '0',
+    'forfaits': '0'
+}
 
 def normalize_division(libdivision):
     """Normalize division names to standardized format."""
@@ -52,50 +71,295 @@ def extract_team_id(libequipe, libdivision):
     # Combine into ID
     return f"{team_number}{gender_marker}" if team_number else None
 
+def parse_division_link(liendivision):
+    """Extract (poule, division) IDs from a liendivision URL."""
+    poule_number = liendivision.split('cx_poule=')[1].split('&')[0] if 'cx_poule=' in liendivision else 'N/A'
+    division_id = liendivision.split('D1=')[1].split('&')[0] if 'D1=' in liendivision else 'N/A'
+    return poule_number, division_id
+
+def parse_score(value):
+    """Convert a rencontre score to int, None when the match is not played yet."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
 def get_team_ranking(client, poule_number, division_id, team_name):
-    """Get team ranking information from the poule."""
+    """Get team ranking information from the poule (official classement_poule)."""
     try:
-        classement_data = client.classement_poule(poule_number, division_id)
-        equipes = classement_data.get('liste', {}).get('classement', [])
-
-        # Ensure equipes is a list
-        if not isinstance(equipes, list):
-            equipes = [equipes]
-
-        # Find the team in the ranking
-        for equipe in equipes:
-            if equipe.get('equipe') == team_name:
-                return {
-                    'rang': equipe.get('clt', 'N/A'),
-                    'points': equipe.get('pts', 'N/A'),
-                    'joues': equipe.get('joue', '0'),
-                    'victoires': equipe.get('vic', '0'),
-                    'nuls': equipe.get('nul', '0'),
-                    'defaites': equipe.get('def', '0'),
-                    'forfaits': equipe.get('pf', '0')
-                }
-
-        # Team not found in ranking
-        return {
-            'rang': 'N/A',
-            'points': 'N/A',
-            'joues': '0',
-            'victoires': '0',
-            'nuls': '0',
-            'defaites': '0',
-            'forfaits': '0'
-        }
+        classement = parse_classement(client.classement_poule(poule_number, division_id))
     except Exception as e:
         print(f"⚠️  Warning: Could not fetch ranking for poule {poule_number}: {e}")
-        return {
-            'rang': 'N/A',
-            'points': 'N/A',
-            'joues': '0',
-            'victoires': '0',
-            'nuls': '0',
-            'defaites': '0',
-            'forfaits': '0'
+        return dict(NO_RANKING)
+    return classement.get(team_name, dict(NO_RANKING))
+
+def parse_result(scorea, scoreb):
+    """Return the (home, away) results ('V', 'N', 'D', 'F') of a rencontre, None if not played.
+
+    A forfeit is reported by the API with an 'F' score for the forfeiting team.
+    """
+    forfeit_a = str(scorea or '').strip().upper().startswith('F')
+    forfeit_b = str(scoreb or '').strip().upper().startswith('F')
+    if forfeit_a or forfeit_b:
+        return ('F' if forfeit_a else 'V', 'F' if forfeit_b else 'V')
+
+    score_a, score_b = parse_score(scorea), parse_score(scoreb)
+    if score_a is None or score_b is None:
+        return None
+    if score_a > score_b:
+        return ('V', 'D')
+    if score_a < score_b:
+        return ('D', 'V')
+    return ('N', 'N')
+
+def compute_standings(tours):
+    """Compute the poule standings from rencontre_equipes results.
+
+    Ties are broken by points in the rencontres between tied teams, then by the
+    games difference between them, then by the overall games difference.
+    Returns a dict team name -> ranking (same format as get_team_ranking).
+    """
+    stats = {}
+    results = []
+    for tour in tours:
+        teams = ((tour.get('equa') or '').strip(), (tour.get('equb') or '').strip())
+        for name in teams:
+            stats.setdefault(name, {'points': 0, 'joues': 0, 'V': 0, 'N': 0, 'D': 0, 'F': 0, 'diff': 0})
+
+        result = parse_result(tour.get('scorea'), tour.get('scoreb'))
+        if result is None:
+            continue
+        diff = (parse_score(tour.get('scorea')) or 0) - (parse_score(tour.get('scoreb')) or 0)
+        results.append((teams, result, diff))
+        for name, res, sign in zip(teams, result, (1, -1)):
+            stats[name]['points'] += MATCH_POINTS[res]
+            stats[name]['joues'] += 1
+            stats[name][res] += 1
+            stats[name]['diff'] += sign * diff
+
+    def head_to_head(tied):
+        points = {name: 0 for name in tied}
+        diffs = {name: 0 for name in tied}
+        for (home, away), (res_home, res_away), diff in results:
+            if home in tied and away in tied:
+                points[home] += MATCH_POINTS[res_home]
+                points[away] += MATCH_POINTS[res_away]
+                diffs[home] += diff
+                diffs[away] -= diff
+        return points, diffs
+
+    by_points = {}
+    for name, s in stats.items():
+        by_points.setdefault(s['points'], []).append(name)
+    tie_breaks = {}
+    for tied in by_points.values():
+        points, diffs = head_to_head(set(tied))
+        tie_breaks.update({name: (points[name], diffs[name]) for name in tied})
+
+    order = sorted(stats, key=lambda name: (-stats[name]['points'], -tie_breaks[name][0],
+                                            -tie_breaks[name][1], -stats[name]['diff'], name))
+    return {
+        name: {
+            'rang': str(rang),
+            'points': str(stats[name]['points']),
+            'joues': str(stats[name]['joues']),
+            'victoires': str(stats[name]['V']),
+            'nuls': str(stats[name]['N']),
+            'defaites': str(stats[name]['D']),
+            'forfaits': str(stats[name]['F'])
+        }
+        for rang, name in enumerate(order, start=1)
+    }
+
+def parse_classement(classement_data):
+    """Convert a classement_poule response to a dict team name -> ranking."""
+    liste = classement_data.get('liste')
+    equipes = liste.get('classement', []) if isinstance(liste, dict) else []
+    if not isinstance(equipes, list):
+        equipes = [equipes]
+    return {
+        equipe.get('equipe'): {
+            'rang': equipe.get('clt', 'N/A'),
+            'points': equipe.get('pts', 'N/A'),
+            'joues': equipe.get('joue', '0'),
+            'victoires': equipe.get('vic', '0'),
+            'nuls': equipe.get('nul', '0'),
+            'defaites': equipe.get('def', '0'),
+            'forfaits': equipe.get('pf', '0')
         }
+        for equipe in equipes
+    }
+
+def standings_match(local, official):
+    """Check that the local standings agree with the official ranking."""
+    return bool(official) and all(
+        name in local and all(local[name][k] == ranking[k] for k in ('rang', 'points', 'joues'))
+        for name, ranking in official.items()
+    )
+
+def resolve_standings(client, poule_number, division_id, tours, cache_dir=RANKING_CACHE_DIR,
+                      check_days=RANKING_CHECK_DAYS, now=None):
+    """Standings of a poule computed from its rencontres.
+
+    The official classement_poule is only fetched when the last check is older than
+    `check_days`, or when it disagreed with the local computation (penalties, score
+    corrections...), in which case the official ranking is used until both agree again.
+    """
+    now = now or datetime.now()
+    local = compute_standings(tours)
+    filename = os.path.join(cache_dir, f"{poule_number}.json")
+
+    try:
+        with open(filename, encoding='utf-8') as f:
+            last_check = json.load(f)
+        checked_at = datetime.fromisoformat(last_check['checked_at'])
+        if last_check['match'] and now - checked_at < timedelta(days=check_days):
+            return local
+    except (FileNotFoundError, KeyError, ValueError):
+        pass
+
+    try:
+        official = parse_classement(client.classement_poule(poule_number, division_id))
+    except Exception as e:
+        print(f"⚠️  Warning: Could not fetch ranking for poule {poule_number}: {e}")
+        return local
+
+    match = standings_match(local, official)
+    if not match:
+        print(f"⚠️  Local standings differ from classement_poule for poule {poule_number}, using official ranking")
+
+    # Atomic write: the rankings and simulation stages resolve the same poules concurrently
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_filename = f"{filename}.{threading.get_ident()}.tmp"
+    with open(tmp_filename, 'w', encoding='utf-8') as f:
+        json.dump({'checked_at': now.isoformat(), 'match': match}, f)
+    os.replace(tmp_filename, filename)
+
+    return local if match else official
+
+def fetch_club_teams(client, club_number):
+    """Fetch the club's teams playing the "FED_Championnat de France"."""
+    all_teams = client.equipes_club(club_number).get('liste').get('equipe')
+
+    # Filter teams with "FED_Championnat de France" in epreuve
+    return [team for team in as_list(all_teams) if "FED_Championnat de France" in team.get('libepr', '')]
+
+def fetch_poules(client, teams):
+    """Fetch rencontre_equipes once per poule: dict poule -> tours."""
+    poules = {}
+    for team in teams:
+        poule_number, _ = parse_division_link(team.get('liendivision', ''))
+        if poule_number not in poules:
+            poules[poule_number] = as_list(client.rencontre_equipes(poule_number).get('liste').get('tour'))
+    return poules
+
+def resolve_poules_standings(client, teams, poules):
+    """Resolved standings (see resolve_standings) of the club's poules: dict poule -> standings."""
+    standings = {}
+    for team in teams:
+        poule_number, division_id = parse_division_link(team.get('liendivision', ''))
+        if poule_number in poules and poule_number not in standings:
+            standings[poule_number] = resolve_standings(client, poule_number, division_id, poules[poule_number])
+    return standings
+
+def build_team_rows(client, teams, poules, club_number, standings=None):
+    """Build the rencontres CSV rows (one per club match, with the team ranking).
+
+    `standings` (dict poule -> standings) is resolved from `poules` when not given.
+    """
+    if standings is None:
+        standings = resolve_poules_standings(client, teams, poules)
+    output = []
+    for team in teams:
+        # Extract poule number and division ID from liendivision
+        poule_number, _ = parse_division_link(team.get('liendivision', ''))
+        rencontres = poules[poule_number]
+
+        # Get team ranking from the poule results (strip phase suffix for lookup)
+        team_name = team.get('libequipe', 'N/A')
+        team_name_for_lookup = team_name.split(' - Phase')[0]  # Remove " - Phase X" suffix
+        ranking = standings[poule_number].get(team_name_for_lookup, dict(NO_RANKING))
+
+        output.append({
+            "id": extract_team_id(team_name, team.get('libdivision', '')),
+            "equipe": team_name,
+            "division": team.get('libdivision', 'N/A'),
+            "poule": poule_number,
+            "ranking": ranking,
+            "rencontres": []
+        })
+
+        # Filter matches for this club
+        club_matches = [match for match in rencontres if match.get('ncluba') == club_number or match.get('nclubb') == club_number]
+
+        for match in club_matches:
+            # Extract tour number from libelle
+            tour_number = match['libelle'].split('tour n°')[1].split(' ')[0]
+
+            # Create match data
+            match_data = {
+                "tour": tour_number,
+                "date": match['datereelle'],
+                "equipe_domicile": match['equa'],
+                "equipe_exterieur": match['equb'],
+                "score_domicile": match['scorea'],
+                "score_exterieur": match['scoreb'],
+                "is_home": match['ncluba'] == club_number
+            }
+
+            # Append match to the current team's rencontres
+            output[-1]["rencontres"].append(match_data)
+
+        # Sort matches by tour number
+        output[-1]["rencontres"].sort(key=lambda x: int(x["tour"]))
+
+    # Prepare data for CSV
+    csv_data = []
+    for team in output:
+        ranking = team['ranking']
+        for match in team['rencontres']:
+            csv_data.append({
+                'team_id': team['id'],
+                'team_name': team['equipe'],
+                'division': normalize_division(team['division']),
+                'poule': team['poule'],
+                'rang': ranking['rang'],
+                'points': ranking['points'],
+                'joues': ranking['joues'],
+                'victoires': ranking['victoires'],
+                'nuls': ranking['nuls'],
+                'defaites': ranking['defaites'],
+                'forfaits': ranking['forfaits'],
+                'tour': match['tour'],
+                'date': match['date'],
+                'equipe_domicile': match['equipe_domicile'],
+                'equipe_exterieur': match['equipe_exterieur'],
+                'score_domicile': match['score_domicile'] or '',  # Handle None values
+                'score_exterieur': match['score_exterieur'] or '',  # Handle None values
+                'is_home': match['is_home']
+            })
+    return csv_data
+
+def save_rencontres_to_csv(csv_data, club_number):
+    """Save the rencontres rows to a CSV file."""
+    # Create data directory if it doesn't exist
+    os.makedirs('data', exist_ok=True)
+
+    # Write to CSV
+    csv_filename = os.path.join('data', f'rencontres_{club_number}.csv')
+    fieldnames = ['team_id', 'team_name', 'division', 'poule', 'rang', 'points',
+                 'joues', 'victoires', 'nuls', 'defaites', 'forfaits',
+                 'tour', 'date', 'equipe_domicile', 'equipe_exterieur',
+                 'score_domicile', 'score_exterieur', 'is_home']
+
+    # Write then rename: the API server never reads a partial file
+    with open(f"{csv_filename}.tmp", 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(csv_data)
+    os.replace(f"{csv_filename}.tmp", csv_filename)
+
+    print(f"\n✅ Data written to {csv_filename}")
 
 def main():
     """Fetch and display USFTT club details and teams."""
@@ -116,104 +380,15 @@ def main():
     try:
         # Get list joueurs du club
         print("📍 Fetching list joueurs du club...")
-        all_teams = client.equipes_club(club_number).get('liste').get('equipe')
-        
-        # Filter teams with "FED_Championnat de France" in epreuve
-        filtered_teams = [team for team in all_teams if "FED_Championnat de France" in team.get('libepr', '')]
-        
-        output = []
-        for team in filtered_teams:
-            # Extract poule number and division ID from liendivision
-            poule_link = team.get('liendivision', '')
-            poule_number = poule_link.split('cx_poule=')[1].split('&')[0] if 'cx_poule=' in poule_link else 'N/A'
-            division_id = poule_link.split('D1=')[1].split('&')[0] if 'D1=' in poule_link else 'N/A'
-
-            # Get team ranking (strip phase suffix for API lookup)
-            team_name = team.get('libequipe', 'N/A')
-            team_name_for_lookup = team_name.split(' - Phase')[0]  # Remove " - Phase X" suffix
-            ranking = get_team_ranking(client, poule_number, division_id, team_name_for_lookup)
-
-            output.append({
-                "id": extract_team_id(team_name, team.get('libdivision', '')),
-                "equipe": team_name,
-                "division": team.get('libdivision', 'N/A'),
-                "poule": poule_number,
-                "ranking": ranking,
-                "rencontres": []
-            })
+        filtered_teams = fetch_club_teams(client, club_number)
+        poules = fetch_poules(client, filtered_teams)
 
-            rencontres = client.rencontre_equipes(poule_number).get('liste').get('tour')
-
-            # Filter matches for this club
-            club_matches = [match for match in rencontres if match.get('ncluba') == club_number or match.get('nclubb') == club_number]
-            
-            for match in club_matches:
-                # Extract tour number from libelle
-                tour_number = match['libelle'].split('tour n°')[1].split(' ')[0]
-                
-                # Create match data
-                match_data = {
-                    "tour": tour_number,
-                    "date": match['datereelle'],
-                    "equipe_domicile": match['equa'],
-                    "equipe_exterieur": match['equb'],
-                    "score_domicile": match['scorea'],
-                    "score_exterieur": match['scoreb'],
-                    "is_home": match['ncluba'] == club_number
-                }
-                
-                # Append match to the current team's rencontres
-                output[-1]["rencontres"].append(match_data)
-                
-            # Sort matches by tour number
-            output[-1]["rencontres"].sort(key=lambda x: int(x["tour"]))
-
-        # Prepare data for CSV
-        csv_data = []
-        for team in output:
-            ranking = team['ranking']
-            for match in team['rencontres']:
-                csv_data.append({
-                    'team_id': team['id'],
-                    'team_name': team['equipe'],
-                    'division': normalize_division(team['division']),
-                    'poule': team['poule'],
-                    'rang': ranking['rang'],
-                    'points': ranking['points'],
-                    'joues': ranking['joues'],
-                    'victoires': ranking['victoires'],
-                    'nuls': ranking['nuls'],
-                    'defaites': ranking['defaites'],
-                    'forfaits': ranking['forfaits'],
-                    'tour': match['tour'],
-                    'date': match['date'],
-                    'equipe_domicile': match['equipe_domicile'],
-                    'equipe_exterieur': match['equipe_exterieur'],
-                    'score_domicile': match['score_domicile'] or '',  # Handle None values
-                    'score_exterieur': match['score_exterieur'] or '',  # Handle None values
-                    'is_home': match['is_home']
-                })
-
-        # Create data directory if it doesn't exist
-        os.makedirs('data', exist_ok=True)
-
-        # Write to CSV
-        csv_filename = os.path.join('data', f'rencontres_{club_number}.csv')
-        fieldnames = ['team_id', 'team_name', 'division', 'poule', 'rang', 'points',
-                     'joues', 'victoires', 'nuls', 'defaites', 'forfaits',
-                     'tour', 'date', 'equipe_domicile', 'equipe_exterieur',
-                     'score_domicile', 'score_exterieur', 'is_home']
-
-        with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(csv_data)
-            
-        print(f"\n✅ Data written to {csv_filename}")
+        csv_data = build_team_rows(client, filtered_teams, poules, club_number)
+        save_rencontres_to_csv(csv_data, club_number)
 
     except Exception as e:
         print(f"❌ Error occurred: {e}")
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Grille officielle FFTT des points gagnés/perdus selon l'écart de points.
+# Tranches d'écart : 0-24, 25-49, 50-99, 100-149, 150-199, 200-299, 300-399, 400-499, 500+
+GAP_BINS = np.array([25, 50, 100, 150, 200, 300, 400, 500])
+NORMAL_WIN = np.array([6, 5.5, 5, 4, 3, 2, 1, 0.5, 0])              # le mieux classé gagne
+NORMAL_LOSS = np.array([-5, -4.5, -4, -3, -2, -1, -0.5, 0, 0])      # le moins bien classé perd
+ABNORMAL_WIN = np.array([6, 7, 8, 10, 13, 17, 22, 28, 40])          # le moins bien classé gagne
+ABNORMAL_LOSS = np.array([-5, -6, -7, -8, -10, -12.5, -16, -20, -29])  # le mieux classé perd
+
+def parse_points(value):
+    """Parse an opponent ranking from parties_joueur.
+
+    `advclaof` holds either points (e.g. "1234") or a classement number
+    (e.g. "12", i.e. 1200 points and more), in which case its lower bound is used.
+    """
+    try:
+        points = float(str(value).replace(',', '.'))
+    except (TypeError, ValueError):
+        return np.nan
+    return points * 100 if points < 100 else points
+
+def parse_coefficient(value):
+    """Parse a competition coefficient, defaulting to 1 (championnat par équipes)."""
+    try:
+        return float(str(value).replace(',', '.'))
+    except (TypeError, ValueError):
+        return 1.0
+
+def is_unprocessed(date, today=None):
+    """Matches of the current month are not yet included in the monthly points."""
+    today = today or datetime.now()
+    parsed_date = datetime.strptime(date, '%d/%m/%Y')
+    return parsed_date.month == today.month and parsed_date.year == today.year
+
+def matches_frame(parties_by_licence, today=None):
+    """Build a DataFrame of unprocessed matches from raw parties_joueur entries."""
+    rows = []
+    for licence, parties in parties_by_licence.items():
+        for partie in parties:
+            if not partie.get('date') or not is_unprocessed(partie['date'], today):
+                continue
+            rows.append({
+                'licence': str(licence),
+                'adv_points': parse_points(partie.get('advclaof')),
+                'victoire': partie.get('vd') == 'V',
+                'coef': parse_coefficient(partie.get('coefchamp')),
+            })
+    return pd.DataFrame(rows, columns=['licence', 'adv_points', 'victoire', 'coef'])
+
+def points_deltas(own_points, adv_points, victoire):
+    """Vectorized grid lookup: points won/lost for each match (before coefficient)."""
+    own_points = np.asarray(own_points, dtype=np.float64)
+    adv_points = np.asarray(adv_points, dtype=np.float64)
+    victoire = np.asarray(victoire, dtype=bool)
+
+    bucket = np.digitize(np.abs(adv_points - own_points), GAP_BINS)
+    favourite = own_points >= adv_points
+    deltas = np.select(
+        [victoire & favourite, victoire & ~favourite, ~victoire & favourite],
+        [NORMAL_WIN[bucket], ABNORMAL_WIN[bucket], ABNORMAL_LOSS[bucket]],
+        default=NORMAL_LOSS[bucket],
+    )
+    # Matches against an unknown opponent ranking do not count
+    return np.where(np.isnan(adv_points) | np.isnan(own_points), 0.0, deltas)
+
+def compute_virtual_points(points, matches, official_points=None):
+    """Return the virtual points of each licence.
+
+    The grid gap is computed, as the federation does, between official (phase)
+    points: `advclaof` is the opponent's official ranking. Gains are added to
+    the monthly points.
+
+    :param points: Series of monthly points indexed by licence
+    :param matches: DataFrame from matches_frame()
+    :param official_points: Series of official points indexed by licence
+        (monthly points when missing)
+    """
+    points = pd.to_numeric(points, errors='coerce')
+    if matches.empty:
+        return points.copy()
+
+    gap_points = points if official_points is None else pd.to_numeric(official_points, errors='coerce').fillna(points)
+    own_points = matches['licence'].map(gap_points).to_numpy(dtype=np.float64)
+    deltas = points_deltas(own_points, matches['adv_points'], matches['victoire']) * matches['coef'].to_numpy()
+    gains = pd.Series(deltas, index=matches['licence']).groupby(level=0).sum()
+    return points.add(gains.reindex(points.index, fill_value=0.0)).round(2)